@@ -0,0 +1,36 @@
+""" Move the finished tournaments of a database to compressed per-season
+    archives, in a folder named after the database, and list what has been
+    archived.
+    Archived tournaments can still be read by id and displayed from the
+    tournaments menu.
+
+    Usage: python archive.py [--database PATH] [--list]
+"""
+import argparse
+import os
+from models import Tournament, base
+
+
+def database_size():
+    return os.path.getsize(base.storage.path) if os.path.exists(base.storage.path) else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archive finished tournaments.')
+    parser.add_argument(
+        '--database', metavar='PATH',
+        help='database to use instead of settings.DATABASE_NAME'
+    )
+    parser.add_argument('--list', action='store_true', help='list archived tournaments and exit')
+    args = parser.parse_args()
+    if args.database:
+        base.open_database(args.database)
+    if args.list:
+        for id, entry in sorted(Tournament.archive_index().items(), key=lambda x: (x[1]['season'], x[0])):
+            print(f"{entry['season']}\t{id}\t{entry['name']}")
+    else:
+        size = database_size()
+        tournaments = Tournament.archive_finished()
+        seasons = sorted({tournament.season for tournament in tournaments})
+        print(f"{len(tournaments)} tournaments archived into seasons {', '.join(seasons) or '-'}")
+        print(f"database: {size / 1000:.1f} kB -> {database_size() / 1000:.1f} kB")
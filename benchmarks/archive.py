@@ -0,0 +1,103 @@
+""" Compare the database size and the latency of everyday operations with
+    years of finished tournaments kept in the live database, then once
+    they are moved to the season archives. Also times the reading of an
+    archived tournament and checks it is unchanged.
+
+    Usage: python -m benchmarks.archive [--tournaments 1000] [--players 16] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from benchmarks.server import use_database
+from models import Match, Player, Round, Tournament, base
+
+
+def finished_tournament(number, players, nb_rounds, rng):
+    """ Return a finished tournament with random pairings and results. """
+    rounds = []
+    for index in range(1, nb_rounds + 1):
+        order = rng.sample(players, len(players))
+        matchs = []
+        for player_1, player_2 in zip(order[::2], order[1::2]):
+            score = rng.choice([0, 0.5, 1])
+            matchs.append(Match(player_1, player_2, score, 1 - score))
+        rounds.append(Round(index=index, matchs=matchs))
+    start_date = datetime(2010 + number % 15, 1 + number % 12, 1)
+    return Tournament(f'Open {number}', nb_rounds, list(players), rounds, start_date, len(players))
+
+
+def create_database(nb_tournaments, nb_players, rng):
+    players = [player.id for player in Player.insert_many(
+        Player(f'First{i}', f'Last{i}', datetime(2000, 1, 1), 'm', i) for i in range(1, 4 * nb_players + 1)
+    )]
+    tournaments = Tournament.insert_many(
+        finished_tournament(number, rng.sample(players, nb_players), 4, rng) for number in range(nb_tournaments)
+    )
+    base.storage.update_many(Tournament.HEADER_TABLE, {tournament.id: tournament.header for tournament in tournaments})
+    live = Tournament('Live open', 4, players[:nb_players], nb_players=nb_players).save()
+    live.get_active_round()
+    return live.id
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        base.identity_map.clear()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def measure(live_id, repeat):
+    def enter_result():
+        tournament = Tournament.get(live_id)
+        match = tournament.get_active_round().matchs[0]
+        tournament.set_score(match, match.player_1)
+        tournament.save()
+
+    return {
+        'database size (kB)': os.path.getsize(base.storage.path) / 1000,
+        'list tournaments (ms)': timed(Tournament.all, repeat) * 1000,
+        'menu statuses (ms)': timed(Tournament.status_index, repeat) * 1000,
+        'enter and save a result (ms)': timed(enter_result, repeat) * 1000,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tournaments', type=int, default=1000)
+    parser.add_argument('--players', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        live_id = create_database(args.tournaments, args.players, rng)
+        sample = rng.sample(sorted(Tournament.status_index().keys() - {live_id}), 20)
+        expected = {id: Tournament.get(id).dict for id in sample}
+        before = measure(live_id, args.repeat)
+        start = time.perf_counter()
+        archived = Tournament.archive_finished()
+        elapsed = time.perf_counter() - start
+        after = measure(live_id, args.repeat)
+        print(f"{len(archived)} finished tournaments archived in {elapsed:.2f} s")
+        print(f"{'':<30} {'live':>10} {'archived':>10}")
+        for name in before:
+            print(f"{name:<30} {before[name]:>10.2f} {after[name]:>10.2f}")
+        base.identity_map.clear()
+        start = time.perf_counter()
+        Tournament.get(sample[0])
+        cold = time.perf_counter() - start
+        base.identity_map.clear()
+        start = time.perf_counter()
+        Tournament.get(sample[0])
+        warm = time.perf_counter() - start
+        print(f"archived tournament: {cold * 1000:.2f} ms, {warm * 1000:.2f} ms once its season is read")
+        base.identity_map.clear()
+        assert all(Tournament.get(id).dict == document for id, document in expected.items()), \
+            'archived tournaments differ from the originals'
+        print("archived tournaments match the originals")
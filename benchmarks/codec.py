@@ -0,0 +1,78 @@
+""" Compare per-document load and dump time of the generated codec with
+    dataclass_factory, on a tournament with nested rounds and matchs.
+    First check that both load a document saved by the first versions of
+    the application, which stored ranks as strings, in the same way.
+
+    Usage: python -m benchmarks.codec [--rounds 9] [--players 100] [--repeat 200]
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from dataclass_factory import Factory, Schema
+from models import Match, Player, Round, Tournament
+from models.codec import Codec
+
+
+factory = Factory(
+    schemas={
+        datetime: Schema(
+            parser=lambda t: datetime.fromtimestamp(t, tz=timezone.utc),
+            serializer=datetime.timestamp
+        ),
+    }
+)
+
+
+def build_tournament(nb_rounds, nb_players):
+    players = list(range(1, nb_players + 1))
+    rounds = [
+        Round(
+            index=index,
+            matchs=[Match(players[i], players[i + 1], 1, 0) for i in range(0, nb_players - 1, 2)],
+            start_date=datetime.now(),
+            end_date=datetime.now(),
+        )
+        for index in range(1, nb_rounds + 1)
+    ]
+    return Tournament('Benchmark', nb_rounds, players, rounds, datetime.now(), nb_players)
+
+
+def measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    codec = Codec()
+    baseline = {
+        'first_name': 'Magnus', 'last_name': 'Carlsen', 'birth_date': 659923200.0, 'sexe': 'm', 'rank': '1'
+    }
+    loaded = codec.load(baseline, Player)
+    assert loaded == factory.load(baseline, Player) and loaded.rank == 1, 'baseline document loaded differently'
+    tournament = build_tournament(args.rounds, args.players)
+    player = Player('Magnus', 'Carlsen', datetime(1990, 11, 30), 'm', 1, 2850.0)
+    for obj in (player, tournament):
+        document = factory.dump(obj)
+        assert codec.dump(obj) == document, 'codec output differs from dataclass_factory'
+        assert codec.load(document, type(obj)) == factory.load(document, type(obj))
+        print(f"{type(obj).__name__} ({len(str(document))} bytes of json)")
+        for name, function in (
+            ('dump', lambda: factory.dump(obj)),
+            ('load', lambda: factory.load(document, type(obj))),
+        ):
+            reference = measure(function, args.repeat)
+            fast = measure(
+                (lambda: codec.dump(obj)) if name == 'dump' else (lambda: codec.load(document, type(obj))),
+                args.repeat
+            )
+            print(
+                f"  {name}: dataclass_factory {reference:9.1f} us, codec {fast:9.1f} us, "
+                f"x{reference / fast:.1f}"
+            )
@@ -0,0 +1,47 @@
+""" Measure Monte Carlo forecast throughput by number of processes, on a
+    synthetic tournament that has not started yet.
+
+    Usage: python -m benchmarks.forecast [--players 200] [--rounds 9] [--simulations 2000]
+"""
+import argparse
+import os
+import time
+from models.forecast import Forecast
+
+
+def synthetic_state(nb_players, nb_rounds):
+    players = list(range(1, nb_players + 1))
+    return {
+        'scores': dict.fromkeys(players, 0),
+        'ratings': {player: 2400 - 4 * player for player in players},
+        'ranks': {player: player for player in players},
+        'by_rank': players,
+        'opponents': dict.fromkeys(players, frozenset()),
+        'balances': dict.fromkeys(players, 0),
+        'colours': {},
+        'byes': set(),
+        'games': {player: [] for player in players},
+        'weighted': dict.fromkeys(players, 0),
+        'pending': [],
+        'next_round': 0,
+        'remaining_rounds': nb_rounds,
+        'nb_rounds': nb_rounds,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--simulations', type=int, default=2000)
+    args = parser.parse_args()
+    forecast = Forecast(synthetic_state(args.players, args.rounds))
+    workers_counts = sorted({1, 2, os.cpu_count() or 1})
+    reference = None
+    for workers in workers_counts:
+        start = time.perf_counter()
+        result = forecast.run(args.simulations, workers=workers)
+        elapsed = time.perf_counter() - start
+        reference = reference or result
+        assert result == reference, 'results depend on the number of processes'
+        print(f"{workers:>3} processes: {args.simulations / elapsed:>8.0f} simulations/s")
@@ -0,0 +1,73 @@
+""" Time the statistics of a player read from the game history against
+    the same games found by loading every tournament, for a club with
+    years of tournaments, half of them archived. Also times the one-off
+    build of the history and its update when a tournament is saved.
+
+    Usage: python -m benchmarks.history [--tournaments 1000] [--players 16] [--repeat 20] [--backend json]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from benchmarks.archive import create_database
+from models import Player, Tournament, base
+from models.history import history
+
+
+def rescan(player_id):
+    """ Return the games of a player found by walking every tournament. """
+    games = []
+    for tournament in Tournament.get_many(base.storage.ids(Tournament._table())):
+        for round_index, round in enumerate(tournament.rounds):
+            for match in round.matchs:
+                if match.is_finished and player_id in (match.player_1, match.player_2):
+                    opponent = match.player_2 if player_id == match.player_1 else match.player_1
+                    games.append((tournament.id, round_index, opponent, match.get_score(player_id)))
+    return games
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        base.identity_map.clear()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tournaments', type=int, default=1000)
+    parser.add_argument('--players', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--backend', choices=['json', 'sqlite3'], default='json')
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        base.open_database(os.path.join(directory, f'db.{args.backend}'))
+        live_id = create_database(args.tournaments // 2, args.players, rng)
+        Tournament.archive_finished()
+        create_database(args.tournaments - args.tournaments // 2, args.players, rng)
+        player = Player.get(Tournament.get(live_id).players[0])
+        start = time.perf_counter()
+        history.build(Tournament.get_many(base.storage.ids(Tournament._table())))
+        print(f"{args.tournaments} tournaments, history built in {time.perf_counter() - start:.2f} s")
+        live = Tournament.get(live_id)
+        match = live.get_active_round().matchs[0]
+        live.settle(match, match.player_1)
+        start = time.perf_counter()
+        live.save()
+        saved = time.perf_counter() - start
+        print(f"save of a tournament, history updated: {saved * 1000:>8.2f} ms")
+        statistics = timed(lambda: Player.get(player.id).statistics(), args.repeat)
+        print(f"statistics from the history:           {statistics * 1000:>8.2f} ms")
+        base.identity_map.clear()
+        start = time.perf_counter()
+        expected = rescan(player.id)
+        print(f"games found by loading every tournament: {(time.perf_counter() - start) * 1000:>6.0f} ms")
+        games = Player.get(player.id).games()
+        print(f"{len(games)} games")
+        assert sorted(games) == sorted(expected), 'the history differs from the tournaments'
+        print("the history matches the tournaments")
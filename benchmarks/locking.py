@@ -0,0 +1,93 @@
+""" Several terminals scoring one tournament at the same time: each process
+    enters the results of its own boards through Tournament.set_score, the
+    journal being compacted into the database as it fills up, and the first
+    process to see a round over pairs the next one.
+
+    Reports lock contention and save conflicts per process, then checks that
+    the saved tournament holds every result entered by every process.
+
+    Usage: python -m benchmarks.locking [--players 100] [--rounds 7] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+from benchmarks.server import create_tournament, use_database
+from models import StaleObjectError, Tournament
+from models.journal import journal
+
+
+def score_boards(directory, tournament_id, number, nb_processes, results):
+    """ Enter the results of the boards of a process until the tournament
+        is over and send back the results entered and lock statistics.
+    """
+    use_database(directory)
+    rng = random.Random(number)
+    tournament = Tournament.get(tournament_id)
+    entered, conflicts = {}, 0
+    while True:
+        tournament.refresh()
+        if tournament.is_finished:
+            break
+        try:
+            active_round = tournament.get_active_round()
+            boards = [
+                (position, match) for position, match in enumerate(active_round.matchs)
+                if position % nb_processes == number and not match.is_finished
+            ]
+            for position, match in boards:
+                tournament.set_score(match, rng.choice([match.player_1, match.player_2, None]))
+                entered[len(tournament.rounds) - 1, position] = (match.score_player_1, match.score_player_2)
+        except StaleObjectError:
+            conflicts += 1
+            continue
+        if not boards:
+            time.sleep(0.001)
+    results.put((number, entered, conflicts, tournament.lock_info(), journal.lock.info()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        tournament_id = create_tournament(args.players, args.rounds).id
+        results = context.Queue()
+        processes = [
+            context.Process(target=score_boards, args=(directory, tournament_id, number, args.processes, results))
+            for number in range(args.processes)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        reports = sorted(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        print(f"{args.processes} processes scored {args.players // 2 * args.rounds} games in {elapsed:.2f} s")
+        print(f"{'process':>7} {'results':>8} {'conflicts':>10} {'lock':>6} {'contended':>10} "
+              f"{'wait (ms)':>10} {'max (ms)':>9} {'journal':>8} {'contended':>10}")
+        entered = {}
+        for number, process_entered, conflicts, lock, journal_lock in reports:
+            entered.update(process_entered)
+            print(
+                f"{number:>7} {len(process_entered):>8} {conflicts:>10} {lock['acquisitions']:>6} "
+                f"{lock['contended']:>10} {lock['wait_time'] * 1000:>10.1f} {lock['max_wait'] * 1000:>9.1f} "
+                f"{journal_lock['acquisitions']:>8} {journal_lock['contended']:>10}"
+            )
+        use_database(directory)
+        tournament = Tournament.get(tournament_id)
+        lost = [
+            position for position, scores in entered.items()
+            if (
+                tournament.rounds[position[0]].matchs[position[1]].score_player_1,
+                tournament.rounds[position[0]].matchs[position[1]].score_player_2,
+            ) != scores
+        ]
+        print(f"saved tournament finished: {tournament.is_finished}, {len(entered)} results entered, "
+              f"{len(lost)} lost")
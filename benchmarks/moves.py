@@ -0,0 +1,113 @@
+""" Record random games in every match of a tournament and compare keeping
+    their moves in the move archive with keeping their PGN movetext in the
+    tournament document: database size, save time and time to read one
+    game. Then time the PGN export of the tournament and its import back,
+    checking that every game comes back unchanged.
+
+    Usage: python -m benchmarks.moves [--players 100] [--rounds 7] [--plies 80] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from benchmarks.server import create_tournament, use_database
+from models import Tournament, base
+from models.board import Position, move_name
+from models.moves import move_archive
+from models.pgn import format_movetext, match_result, to_san
+from pgn import export_games, import_games
+
+
+def random_game(rng, nb_plies):
+    """ Return up to nb_plies random legal moves, fewer if the game ends. """
+    position, moves = Position.initial(), []
+    for _ in range(nb_plies):
+        legal_moves = position.legal_moves()
+        if not legal_moves:
+            break
+        move = rng.choice(legal_moves)
+        moves.append(move_name(move))
+        position = position.push(move)
+    return moves
+
+
+def play(tournament, rng, nb_plies):
+    """ Play every round of the tournament, recording random games. """
+    while not tournament.is_finished:
+        active_round = tournament.get_active_round()
+        tournament.set_games([(match, random_game(rng, nb_plies)) for match in active_round.matchs])
+        active_round = tournament.get_active_round()
+        tournament.set_scores(
+            (match, rng.choice([match.player_1, match.player_2, None])) for match in active_round.matchs
+        )
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--plies', type=int, default=80)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        tournament = create_tournament(args.players, args.rounds)
+        start = time.perf_counter()
+        play(tournament, rng, args.plies)
+        matchs = [match for round in tournament.rounds for match in round.matchs]
+        games = {id(match): match.moves for match in matchs}
+        nb_moves = sum(map(len, games.values()))
+        print(f"{len(matchs)} games, {nb_moves} moves played and recorded in {time.perf_counter() - start:.1f} s")
+
+        table = Tournament._table()
+        document = base.storage.get(table, tournament.id)
+        inline = json.loads(json.dumps(document))
+        for round, stored_round in zip(tournament.rounds, inline['rounds']):
+            for match, stored_match in zip(round.matchs, stored_round['matchs']):
+                stored_match['pgn'] = format_movetext(to_san(games[id(match)]), match_result(match))
+        print(f"{'':<22}{'document':>10}{'save':>10}{'read one game':>16}")
+        archived = os.path.getsize(move_archive.data_path) + os.path.getsize(move_archive.index_path)
+        save = timed(lambda: base.storage.update(table, tournament.id, document), args.repeat)
+        read = timed(lambda: move_archive.get(matchs[-1].game), args.repeat)
+        print(
+            f"{'move archive':<22}{len(json.dumps(document)) / 1000:>8.1f}kB{save * 1000:>8.1f}ms"
+            f"{read * 1e6:>13.1f}us   (+ {archived / 1000:.1f} kB archive)"
+        )
+        save = timed(lambda: base.storage.update(table, tournament.id, inline), args.repeat)
+        read = timed(lambda: base.storage.get(table, tournament.id)['rounds'][-1]['matchs'][-1]['pgn'], args.repeat)
+        print(
+            f"{'pgn in the document':<22}{len(json.dumps(inline)) / 1000:>8.1f}kB"
+            f"{save * 1000:>8.1f}ms{read * 1e6:>13.1f}us"
+        )
+        base.storage.update(table, tournament.id, document)
+
+        path = os.path.join(directory, 'games.pgn')
+        start = time.perf_counter()
+        with open(path, 'w') as file:
+            exported = export_games([tournament], file)
+        elapsed = time.perf_counter() - start
+        print(f"pgn export: {exported} games, {os.path.getsize(path) / 1000:.1f} kB in {elapsed:.2f} s")
+        start = time.perf_counter()
+        imported, errors = import_games(tournament, path)
+        elapsed = time.perf_counter() - start
+        print(f"pgn import: {imported} games in {elapsed:.2f} s, {len(errors)} rejected")
+        assert not errors, errors[:5]
+        base.identity_map.clear()
+        tournament = Tournament.get(tournament.id)
+        reimported = [match for round in tournament.rounds for match in round.matchs]
+        assert [match.moves for match in reimported] == [games[id(match)] for match in matchs]
+        assert [match_result(match) for match in reimported] == [match_result(match) for match in matchs]
+        print("every game was imported back unchanged")
@@ -0,0 +1,81 @@
+""" Soak test of menu navigation: walk back and forth between the main menu
+    and the player and tournament menus, and check that the call stack depth
+    and the allocated memory stay constant.
+
+    Usage: python -m benchmarks.navigation [--transitions 100000]
+"""
+import argparse
+import re
+from array import array
+import sys
+import tracemalloc
+from controllers import AppManager
+from headless import CountingStorage, ScriptedConsole
+from models import base
+from views import AppView
+from views.base import BaseView
+
+
+class NavigationConsole(ScriptedConsole):
+    """ Console answering menus by option description, cycling through
+        DESCRIPTIONS, and sampling stack depth and memory on each answer.
+    """
+
+    DESCRIPTIONS = ('Manage players', 'Back', 'Manage tournaments', 'Back')
+
+    def __init__(self, transitions, storage):
+        super().__init__([], storage)
+        self.transitions = transitions
+        self.count = 0
+        # Preallocated so that the samples do not show up as growth.
+        self.depths = array('q', bytes(8 * transitions))
+        self.memory = array('q', bytes(8 * transitions))
+
+    def input(self, prompt=''):
+        if self.count >= self.transitions:
+            raise EOFError('end of soak test')
+        description = self.DESCRIPTIONS[self.count % len(self.DESCRIPTIONS)]
+        options = dict(
+            (text, index) for index, text in re.findall(r'\[(\w+)\] ([^\n]+)', prompt)
+        )
+        frame, depth = sys._getframe(), 0
+        while frame:
+            frame, depth = frame.f_back, depth + 1
+        self.depths[self.count] = depth
+        self.memory[self.count] = tracemalloc.get_traced_memory()[0]
+        self.count += 1
+        return options[description]
+
+    def run_action(self, option):
+        # Skip timing records, they would grow with the number of actions.
+        option.get('action')()
+
+
+def soak(transitions):
+    """ Run the navigation loop and return the console holding samples. """
+    storage = base.storage = CountingStorage(base.storage)
+    console = BaseView.console = NavigationConsole(transitions, storage)
+    tracemalloc.start()
+    try:
+        AppManager(model=None, view=AppView()).start()
+    except EOFError:
+        pass
+    tracemalloc.stop()
+    return console
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transitions', type=int, default=100000)
+    args = parser.parse_args()
+    console = soak(args.transitions)
+    window = min(1000, console.count // 3)
+    first, last = console.depths[:window], console.depths[-window:]
+    memory_growth = (
+        sum(console.memory[-window:]) - sum(console.memory[window:2 * window])
+    ) / window
+    print(f"transitions: {console.count}")
+    print(f"stack depth: first {max(first)}, last {max(last)}")
+    print(f"memory growth after warm-up: {memory_growth / 1024:.1f} KiB")
+    if max(last) > max(first) or memory_growth > 64 * 1024:
+        sys.exit('navigation is leaking stack frames or memory')
@@ -0,0 +1,76 @@
+""" Check that Swiss pairings never contain an avoidable rematch over many
+    small random tournaments, then measure pairing time as the number of
+    players grows.
+
+    Usage: python -m benchmarks.pairing [--rounds 9] [--sizes 100 250 500 1000 2000]
+                                        [--tournaments 200] [--players 8] [--played 4]
+"""
+import argparse
+import random
+import time
+from models.pairing import SwissPairing, maximum_matching
+
+
+def check_rematches(pairing, pairs, bye):
+    """ Fail if the round has a rematch while a pairing of every player,
+        bye apart, without any rematch exists.
+    """
+    if not any(pairing.is_rematch(white, black) for white, black in pairs):
+        return
+    for candidate in pairing.bye_candidates() if bye is not None else [None]:
+        players = [player for player in pairing.standings if player != candidate]
+        mates = maximum_matching(players, lambda x, y: not pairing.is_rematch(x, y))
+        assert len(mates) < len(players), f"avoidable rematch in {pairs} (bye {bye})"
+
+
+def simulate(nb_players, nb_rounds, seed=0):
+    """ Pair and play random results for a full tournament, return the
+        pairing time of each round in seconds.
+    """
+    rng = random.Random(seed)
+    players = list(range(1, nb_players + 1))
+    ranks = {player: player for player in players}
+    scores = dict.fromkeys(players, 0)
+    opponents = {player: set() for player in players}
+    colours = {player: [] for player in players}
+    byes = set()
+    timings = []
+    for _ in range(nb_rounds):
+        standings = sorted(players, key=lambda x: (-scores[x], ranks[x]))
+        start = time.perf_counter()
+        pairing = SwissPairing(standings, scores, opponents, colours, byes)
+        pairs, bye = pairing.pair()
+        timings.append(time.perf_counter() - start)
+        check_rematches(pairing, pairs, bye)
+        for white, black in pairs:
+            opponents[white].add(black)
+            opponents[black].add(white)
+            colours[white].append('w')
+            colours[black].append('b')
+            result = rng.choice((1, 0.5, 0))
+            scores[white] += result
+            scores[black] += 1 - result
+        if bye is not None:
+            byes.add(bye)
+            scores[bye] += 1
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 250, 500, 1000, 2000])
+    parser.add_argument('--tournaments', type=int, default=200)
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--played', type=int, default=4, help='rounds of the checked tournaments')
+    args = parser.parse_args()
+    for seed in range(args.tournaments):
+        simulate(args.players, args.played, seed)
+    print(f"{args.tournaments} tournaments of {args.players} players and {args.played} rounds: no avoidable rematch")
+    print(f"{'players':>8} {'mean (ms)':>10} {'max (ms)':>10}")
+    for size in args.sizes:
+        timings = simulate(size, args.rounds)
+        print(
+            f"{size:>8} {sum(timings) / len(timings) * 1000:>10.2f} "
+            f"{max(timings) * 1000:>10.2f}"
+        )
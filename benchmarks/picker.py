@@ -0,0 +1,91 @@
+""" Time the enrollment of one player out of many registered ones: the
+    former picker listing every registered player not enrolled yet,
+    against the paged picker reading one page from the name index, then
+    narrowing it down with a prefix search.
+
+    Usage: python -m benchmarks.picker [--players 20000] [--repeat 5]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from benchmarks.server import use_database
+from models import Player, Tournament, base
+from views.base import BaseView
+
+
+class ScriptedConsole:
+    """ Console answering from a list and counting the lines printed. """
+
+    def __init__(self, answers):
+        self.answers = iter(answers)
+        self.lines = 0
+
+    def input(self, prompt=''):
+        self.lines += prompt.count('\n') + 1
+        return next(self.answers)
+
+    def print(self, *args, **kwargs):
+        self.lines += ' '.join(map(str, args)).count('\n') + 1
+
+
+class Picker(BaseView):
+
+    def setup(self, controller):
+        pass
+
+
+def list_picker(tournament):
+    """ The former picker: list every player not enrolled, pick the last. """
+    players = [player for player in Player.all() if not tournament.is_enrolled(player)]
+    view = Picker()
+    view.console = ScriptedConsole([])
+    view.display_objects(players)
+    return players[-1], view.console.lines
+
+
+def paged_picker(tournament, last_name):
+    """ The paged picker: first page, then a search, then a selection. """
+    enrolled = tournament.players
+    view = Picker()
+    view.console = ScriptedConsole([last_name, '1'])
+    player = view.get_selected_object(
+        Player.search(exclude=enrolled), lambda query: Player.search(query, exclude=enrolled)
+    )
+    return player, view.console.lines
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        base.identity_map.clear()
+        Player._indexes = None
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        players = Player.insert_many(
+            Player(f'First{i}', f'Last{i}', datetime(2000, 1, 1), 'm', i) for i in range(1, args.players + 1)
+        )
+        tournament = Tournament('Open', 4, [player.id for player in players[:4]], nb_players=8).save()
+        wanted = players[-1]
+        elapsed, (player, lines) = timed(lambda: list_picker(tournament), args.repeat)
+        print(f"list picker:  {elapsed * 1000:>8.1f} ms, {lines:>6} lines printed")
+        assert player.id == wanted.id
+        elapsed, (player, lines) = timed(lambda: paged_picker(tournament, wanted.last_name), args.repeat)
+        print(f"paged picker: {elapsed * 1000:>8.1f} ms, {lines:>6} lines printed (index built)")
+        assert player.id == wanted.id, player
+        Player.indexes()
+        start = time.perf_counter()
+        player, lines = paged_picker(tournament, wanted.last_name)
+        print(f"paged picker: {(time.perf_counter() - start) * 1000:>8.1f} ms, {lines:>6} lines printed (index kept)")
@@ -0,0 +1,45 @@
+""" Measure full Elo recomputation time over a synthetic game history.
+
+    Usage: python -m benchmarks.rating [--games 1000000] [--players 20000] [--period 500]
+"""
+import argparse
+import random
+import time
+from models import rating
+from models.rating import EloRating
+
+
+def history(nb_games, nb_players, period_size, seed=0):
+    """ Return random rating periods of period_size games each. """
+    rng = random.Random(seed)
+    periods = []
+    for start in range(0, nb_games, period_size):
+        periods.append([
+            (rng.randrange(nb_players), rng.randrange(nb_players), rng.choice((1, 0.5, 0)))
+            for _ in range(min(period_size, nb_games - start))
+        ])
+    return periods
+
+
+def timed(engine, periods):
+    start = time.perf_counter()
+    engine.recompute(periods)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=1000000)
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--period', type=int, default=500)
+    args = parser.parse_args()
+    periods = history(args.games, args.players, args.period)
+    engine = EloRating()
+    print(f"{args.games} games, {args.players} players, {len(periods)} periods")
+    numpy, rating.numpy = rating.load_numpy(), None
+    print(f"python: {timed(engine, periods):.2f}s")
+    rating.numpy = numpy
+    if rating.numpy is not None:
+        print(f"numpy:  {timed(engine, periods):.2f}s")
+    else:
+        print("numpy:  not installed")
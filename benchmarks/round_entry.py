@@ -0,0 +1,73 @@
+""" Compare entering the results of a round match by match, the way the
+    "Enter match results" menu action does, with entering the whole round
+    and committing it at once. Rounds alternate between both paths, then
+    the saved tournament is checked against the results entered.
+
+    Usage: python -m benchmarks.round_entry [--players 200] [--rounds 6] [--backend json]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from benchmarks.server import create_tournament
+from models import Match, Tournament, base
+
+
+def per_match(rng, entered):
+    """ Enter each result of the active round in its own menu action. """
+    while True:
+        tournament = Tournament.get_unfinished()[0]
+        tournament.refresh()
+        match = tournament.get_active_match()
+        round_index = len(tournament.rounds) - 1
+        winner = rng.choice([match.player_1, match.player_2, None])
+        tournament.set_score(match, winner)
+        entered[round_index, tournament.rounds[round_index].matchs.index(match)] = winner
+        if tournament.rounds[-1].is_finished:
+            return
+
+
+def per_round(rng, entered):
+    """ Enter every result of the active round and commit them at once. """
+    tournament = Tournament.get_unfinished()[0]
+    tournament.refresh()
+    active_round = tournament.get_active_round()
+    round_index = len(tournament.rounds) - 1
+    results = []
+    for match_index, match in enumerate(active_round.matchs):
+        winner = rng.choice([match.player_1, match.player_2, None])
+        results.append((match, winner))
+        entered[round_index, match_index] = winner
+    tournament.set_scores(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=6)
+    parser.add_argument('--backend', choices=['json', 'sqlite3'], default='json')
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        base.open_database(os.path.join(directory, f'db.{args.backend}'))
+        tournament_id = create_tournament(args.players, args.rounds).id
+        times, entered = {per_match: [], per_round: []}, {}
+        for number in range(args.rounds):
+            path = per_match if number % 2 == 0 else per_round
+            start = time.perf_counter()
+            path(rng, entered)
+            times[path].append(time.perf_counter() - start)
+        print(f"{args.players // 2} boards per round, {args.backend} backend")
+        for path, durations in times.items():
+            print(f"{path.__name__:<10} {statistics.median(durations) * 1000:>9.1f} ms per round")
+        base.identity_map.clear()
+        tournament = Tournament.get(tournament_id)
+        for (round_index, match_index), winner in entered.items():
+            match = tournament.rounds[round_index].matchs[match_index]
+            expected = Match(match.player_1, match.player_2)
+            expected.set_score(winner)
+            assert (match.score_player_1, match.score_player_2) == (expected.score_player_1, expected.score_player_2)
+        assert tournament.is_finished, 'some results were not saved'
+        print(f"all {len(entered)} results saved")
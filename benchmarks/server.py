@@ -0,0 +1,162 @@
+""" Load test of the json api: a swarm of local clients, each in charge of
+    some boards, posts every result of a synthetic tournament while polling
+    the active match and the standings. Reports requests per second and
+    latency percentiles, then checks the saved tournament.
+
+    The server runs in its own process on a temporary database.
+
+    Usage: python -m benchmarks.server [--players 200] [--rounds 9] [--clients 32]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+import server
+from models import Player, Tournament, base
+
+
+def use_database(directory):
+    base.open_database(os.path.join(directory, 'db.json'))
+
+
+def run_server(directory, port):
+    use_database(directory)
+    asyncio.run(server.serve(port=port))
+
+
+class Client:
+    """ Keep-alive http client recording the latency of its requests. """
+
+    def __init__(self, port, latencies):
+        self.port = port
+        self.latencies = latencies
+
+    async def connect(self, timeout=10):
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                self.reader, self.stream = await asyncio.open_connection('127.0.0.1', self.port)
+                return
+            except ConnectionError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        start = time.perf_counter()
+        self.stream.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.stream.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode().partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        data = json.loads(await self.reader.readexactly(length))
+        self.latencies[method].append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{method} {path}: {status} {data}")
+        return data
+
+    def close(self):
+        self.stream.close()
+
+
+async def play_boards(client, tournament_id, number, nb_clients, seed):
+    """ Post the results of the boards of a client until the tournament is
+        over, reading the standings after each result.
+    """
+    rng = random.Random(seed)
+    await client.connect()
+    while True:
+        active = await client.request('GET', f'/tournaments/{tournament_id}/active-match')
+        if active['round'] is None:
+            break
+        boards = [match for match in active['pending'] if match['board'] % nb_clients == number]
+        if not boards:
+            await asyncio.sleep(0.001)
+            continue
+        for match in boards:
+            result = {'round': active['round'], 'player_1': match['player_1'], 'player_2': match['player_2']}
+            result['winner'] = rng.choice([match['player_1'], match['player_2'], 'draw'])
+            await client.request('POST', f'/tournaments/{tournament_id}/results', result)
+            await client.request('GET', f'/tournaments/{tournament_id}/standings')
+    client.close()
+
+
+async def swarm(port, tournament_id, nb_clients):
+    latencies = defaultdict(list)
+    clients = [Client(port, latencies) for _ in range(nb_clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play_boards(client, tournament_id, number, nb_clients, number)
+        for number, client in enumerate(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    stats_client = Client(port, defaultdict(list))
+    await stats_client.connect()
+    stats = await stats_client.request('GET', '/stats')
+    stats_client.close()
+    return latencies, elapsed, stats
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[round(fraction * (len(values) - 1))]
+
+
+def create_tournament(nb_players, nb_rounds):
+    players = Player.insert_many(
+        Player(f'First{i}', f'Last{i}', datetime(2000, 1, 1), 'm', i) for i in range(1, nb_players + 1)
+    )
+    tournament = Tournament(
+        'Load test', nb_rounds, [player.id for player in players], nb_players=nb_players
+    )
+    return tournament.save()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        tournament_id = create_tournament(args.players, args.rounds).id
+        process = multiprocessing.get_context('spawn').Process(
+            target=run_server, args=(directory, args.port), daemon=True
+        )
+        process.start()
+        try:
+            latencies, elapsed, stats = asyncio.run(swarm(args.port, tournament_id, args.clients))
+        finally:
+            process.terminate()
+            process.join()
+        nb_requests = sum(len(values) for values in latencies.values())
+        print(f"{args.clients} clients, {nb_requests} requests in {elapsed:.2f} s: "
+              f"{nb_requests / elapsed:.0f} requests/s")
+        for method, values in sorted(latencies.items()):
+            print(f"{method:<5} {len(values):>7} requests  p50 {percentile(values, 0.5) * 1000:>7.2f} ms"
+                  f"  p99 {percentile(values, 0.99) * 1000:>7.2f} ms")
+        print(f"writer: {stats['operations']} operations saved in {stats['batches']} batches")
+        use_database(directory)
+        tournament = Tournament.get(tournament_id)
+        games = args.players // 2 * args.rounds
+        print(f"saved tournament finished: {tournament.is_finished}, "
+              f"{sum(round.is_finished for round in tournament.rounds)}/{args.rounds} rounds, "
+              f"{sum(match.is_finished for round in tournament.rounds for match in round.matchs)}/{games} games")
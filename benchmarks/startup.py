@@ -0,0 +1,65 @@
+""" Measure the time from launching main.py to the display of the first menu,
+    for databases of growing size. Since the database is only opened by the
+    first query, this time should not depend on the size of the database.
+
+    Usage: python -m benchmarks.startup [--sizes 0 10000 50000] [--repeat 5] [--backend json]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from models import Player, base
+
+
+MENU_PROMPT = b'=> '
+
+
+def create_database(path, nb_players):
+    base.open_database(path)
+    Player.insert_many(
+        Player(f'First{i}', f'Last{i}', datetime(2000, 1, 1), 'm', i) for i in range(1, nb_players + 1)
+    )
+    base.storage.close()
+
+
+def time_to_menu(path):
+    """ Return the seconds from launching main.py to its first menu. """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, 'main.py', '--database', path],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    # Answer the greeting, then wait for the menu.
+    process.stdin.write(b'\n')
+    process.stdin.flush()
+    output = b''
+    while MENU_PROMPT not in output:
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError(f"main.py exited before its menu: {output[-200:]!r}")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', choices=['json', 'sqlite3'], default='json')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f'db{size}.{args.backend}')
+            create_database(path, size)
+            times = [time_to_menu(path) for _ in range(args.repeat)]
+            print(
+                f"{size:>8} players, {os.path.getsize(path) / 1e6:>7.1f} MB: "
+                f"first menu after {statistics.median(times) * 1000:>6.1f} ms (median of {args.repeat})"
+            )
@@ -0,0 +1,83 @@
+""" Time the standings of a large open: the tie-break index is built once,
+    updated as results are entered, and compared with a fresh build and
+    with tie-breaks computed by rescanning every match for every player.
+
+    Usage: python -m benchmarks.tiebreaks [--players 500] [--rounds 11] [--repeat 100]
+"""
+import argparse
+import random
+import tempfile
+import time
+from benchmarks.server import create_tournament, use_database
+from models.tiebreaks import TiebreakIndex
+from settings import BYE_SCORE
+
+
+def rescan(tournament):
+    """ Return {player: (buchholz, sonneborn-berger)} by looking for the
+        games of each player in every round.
+    """
+    scores = tournament.scores
+    tiebreaks = {}
+    for player in tournament.players:
+        buchholz = sonneborn_berger = 0
+        for round in tournament.rounds:
+            for match in round.matchs:
+                if player in (match.player_1, match.player_2):
+                    opponent = match.player_2 if player == match.player_1 else match.player_1
+                    buchholz += scores[opponent]
+                    sonneborn_berger += match.get_score(player) * scores[opponent]
+        tiebreaks[player] = (buchholz, sonneborn_berger)
+    return tiebreaks
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=11)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        use_database(directory)
+        tournament = create_tournament(args.players, args.rounds)
+        nb_results, settle_time = 0, 0.0
+        while not tournament.is_finished:
+            for match in tournament.get_active_round().matchs:
+                start = time.perf_counter()
+                tournament.settle(match, rng.choice([match.player_1, match.player_2, None]))
+                settle_time += time.perf_counter() - start
+                nb_results += 1
+        # Correct a few results to exercise updates of settled matchs.
+        for round in rng.sample(tournament.rounds, 3):
+            match = rng.choice(round.matchs)
+            tournament.settle(match, match.player_1)
+
+        def standings():
+            tournament._standings = None
+            tournament.get_sorted_players()
+
+        print(f"{args.players} players, {args.rounds} rounds, {nb_results} results")
+        print(f"settle, index updated:   {settle_time / nb_results * 1e6:>9.1f} us per result")
+        print(f"sorted standings:        {timed(standings, args.repeat) * 1000:>9.2f} ms")
+        build = timed(lambda: TiebreakIndex.build(tournament.players, tournament.rounds, BYE_SCORE), args.repeat)
+        print(f"index built from rounds: {build * 1000:>9.2f} ms")
+        start = time.perf_counter()
+        expected = rescan(tournament)
+        print(f"rescan of every match:   {(time.perf_counter() - start) * 1000:>9.2f} ms")
+        fresh = TiebreakIndex.build(tournament.players, tournament.rounds, BYE_SCORE)
+        index = tournament.tiebreaks
+        assert all(
+            (index.buchholz(player), index.sonneborn_berger(player), index.progressive(player))
+            == (fresh.buchholz(player), fresh.sonneborn_berger(player), fresh.progressive(player))
+            and (index.buchholz(player), index.sonneborn_berger(player)) == expected[player]
+            for player in tournament.players
+        ), 'incremental tie-breaks differ from a full computation'
+        print("incremental tie-breaks match a full computation")
@@ -1,4 +1,44 @@
 from abc import ABC
+from models import StaleObjectError
+
+
+class Navigator:
+    """ Stack of managers, the manager on top of the stack owns the
+        interface. Moving between screens pushes or pops managers instead
+        of nesting loops, so the call stack stays flat.
+    """
+
+    def __init__(self):
+        self.stack = []
+
+    def push(self, manager):
+        """ Display a new manager on top of the current one. """
+        manager.navigator = self
+        self.stack.append(manager)
+
+    def pop(self):
+        """ Go back to the previous manager. """
+        self.stack.pop()
+
+    def clear(self):
+        """ Close every manager, which ends the loop. """
+        self.stack.clear()
+
+    def run(self):
+        """ Setup and launch the view of the top manager until the stack
+            is empty. An action conflicting with another process is
+            reported and the menu displayed again, the conflicting
+            instance having been evicted so that it is read again from the
+            database.
+        """
+        while self.stack:
+            manager = self.stack[-1]
+            manager.view.setup(manager)
+            manager.view.clear()
+            try:
+                manager.view.start()
+            except StaleObjectError as error:
+                manager.view.display_conflict(error)
 
 
 class BaseManager(ABC):
@@ -7,10 +47,10 @@ class BaseManager(ABC):
     def __init__(self, view, model=None):
         self.view = view
         self.model = model
+        self.navigator = None
 
     def start(self):
-        """ Setup and launch the view in an infinite loop"""
-        while True:
-            self.view.setup(self)
-            self.view.clear()
-            self.view.start()
+        """ Run the application with this manager as first screen. """
+        navigator = Navigator()
+        navigator.push(self)
+        navigator.run()
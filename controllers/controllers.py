@@ -1,7 +1,9 @@
 from datetime import datetime
-from sys import exit
 from models import Player, Tournament
-from views import AppView, PlayerView, TournamentView
+from models.forecast import Forecast
+from models.pgn import format_movetext, from_san, match_result, parse_movetext, to_san
+from settings import FORECAST_TOP, PAGE_SIZE
+from views import PlayerView, TournamentView
 from .base import BaseManager
 
 
@@ -24,23 +26,45 @@ class PlayerManager(BaseManager):
         player.save()
 
     def update_rank(self):
-        player, new_rank = self.view.update_rank(self.model.all())
+        player, new_rank = self.view.update_rank(self.model.search(), self.model.search)
         player.rank = new_rank
         player.save()
 
+    def update_ratings(self):
+        """ Recompute ratings and ranks from all finished matchs. """
+        players = self.model.update_ratings()
+        self.view.display_ratings_updated(len(players))
+
     def show_all_by_rank(self):
         """ Display all registred players in the interface ordered by rank. """
-        players = sorted(self.model.all(), key=lambda x: x.rank)
-        self.view.display_players(players)
+        self.show_pages(self.model.indexes()['rank'])
 
     def show_all_by_name(self):
         """ Display all registred players in the interface in alphabetical order. """
-        players = sorted(self.model.all(), key=lambda x: (x.first_name, x.last_name))
-        self.view.display_players(players)
+        self.show_pages(self.model.indexes()['name'])
+
+    def show_statistics(self):
+        """ Display the games, score, head-to-head results and performance
+            rating of a player.
+        """
+        player = self.view.get_player(self.model.search(), self.model.search)
+        statistics = player.statistics()
+        # Only the most played opponents are listed.
+        opponents = self.model.get_many(list(statistics.head_to_head)[:PAGE_SIZE])
+        head_to_head = [(opponent, *statistics.head_to_head[opponent.id]) for opponent in opponents]
+        self.view.display_statistics(player, statistics, head_to_head)
+
+    def show_pages(self, index):
+        """ Display players page by page following the order of an index. """
+        nb_pages = -(-len(index) // PAGE_SIZE)
+        for number in range(nb_pages):
+            players = self.model.get_page(index.page(number, PAGE_SIZE))
+            if not self.view.display_players(players, number + 1, nb_pages):
+                break
 
     def back(self):
         """ Go back to App manager. """
-        AppManager(view=AppView()).start()
+        self.navigator.pop()
 
 
 class TournamentManager(BaseManager):
@@ -48,21 +72,19 @@ class TournamentManager(BaseManager):
     def create(self):
         """ Create and save a new tournament """
         tournament = self.model(**{'name': self.view.get_name()})
+        nb_rounds = self.view.get_nb_rounds(tournament.nb_rounds)
+        if nb_rounds:
+            tournament.nb_rounds = nb_rounds
+        nb_players = self.view.get_nb_players(tournament.max_players)
+        if nb_players:
+            tournament.nb_players = nb_players
         tournament.save()
 
-    def not_enrolled_players(self):
-        """ Return a list of registred players not yet enrolled in the
-            active tournament.
-        """
-        return [
-            player for player in Player.all()
-            if player.id not in self.active_tournament.players
-        ]
-
     def set_active_tournament(self, tournaments):
         """ set active_tournament class attribute to the tournament given
             as args, if multiple tournament given then ask user to
-            choose one.
+            choose one. Return the active tournament, or None after telling
+            the user if there is none.
         """
         if len(tournaments) == 1:
             self.active_tournament = tournaments[0]
@@ -70,34 +92,141 @@ class TournamentManager(BaseManager):
             self.active_tournament = self.view.get_active_tournament(tournaments)
         else:
             self.active_tournament = None
+        if self.active_tournament is None:
+            self.view.display_no_tournament()
+        else:
+            # Pick up the changes made from other terminals.
+            self.active_tournament.refresh()
+        return self.active_tournament
 
     def enroll_player(self):
         """ Enroll a new player to the active tournament. """
-        self.set_active_tournament(self.model.get_unready())
-        players = self.not_enrolled_players()
-        if players:
-            player = self.view.get_player(players, self.active_tournament)
+        if self.set_active_tournament(self.model.get_unready()) is None:
+            return
+        enrolled = self.active_tournament.players
+        # Registered players not yet enrolled, searched from the indexes.
+        players = Player.search(exclude=enrolled)
+        if len(players):
+            player = self.view.get_player(
+                players, self.active_tournament, lambda query: Player.search(query, exclude=enrolled)
+            )
             self.active_tournament.enroll_player(player)
 
     def enter_results(self):
-        self.set_active_tournament(self.model.get_unfinished())
+        if self.set_active_tournament(self.model.get_unfinished()) is None:
+            return
         active_match = self.active_tournament.get_active_match()
         if active_match:
             self.set_score(active_match, self.active_tournament)
-            self.active_tournament.save()
 
-    def display_results(self):
-        self.set_active_tournament(self.model.get_ready())
-        players = [
-            Player.get(player)
-            for player in self.active_tournament.get_sorted_players()
+    def enter_round_results(self):
+        """ Enter the results of every pending match of the active round,
+            saved together once all of them are entered.
+        """
+        if self.set_active_tournament(self.model.get_unfinished()) is None:
+            return
+        active_round = self.active_tournament.get_active_round()
+        if active_round is None:
+            return
+        boards = [
+            (board, match) for board, match in enumerate(active_round.matchs, 1) if not match.is_finished
         ]
+        players = {
+            player.id: player for player in Player.get_many(
+                {id for _, match in boards for id in (match.player_1, match.player_2)}
+            )
+        }
+        winners = self.view.get_round_results(
+            active_round, [(board, players[match.player_1], players[match.player_2]) for board, match in boards]
+        )
+        results = [
+            (match, None if winner == 'draw' else winner)
+            for (_, match), winner in zip(boards, winners) if winner is not None
+        ]
+        if results:
+            self.active_tournament.set_scores(results)
+        self.view.display_round_results_saved(len(results), len(boards))
+
+    def display_results(self):
+        if self.set_active_tournament(self.model.get_ready()) is None:
+            return
+        players = Player.get_many(self.active_tournament.get_sorted_players())
         self.view.display_results(players, self.active_tournament)
 
+    def display_forecast(self):
+        """ Display the chances of each player to win or finish in the top
+            places of the active tournament.
+        """
+        if self.set_active_tournament(self.model.get_unfinished()) is None:
+            return
+        forecast = Forecast.from_tournament(self.active_tournament)
+        forecast = forecast.run(
+            forecast.nb_simulations(), top=FORECAST_TOP, progress=self.view.display_forecast_progress
+        )
+        players = Player.get_many(
+            sorted(forecast, key=lambda x: forecast[x], reverse=True)
+        )
+        self.view.display_forecast(players, forecast, self.active_tournament, FORECAST_TOP)
+
     def display_report(self):
-        self.set_active_tournament(self.model.get_ready())
+        if self.set_active_tournament(self.model.get_ready()) is None:
+            return
         self.view.display_report(self.active_tournament)
 
+    def archive(self):
+        """ Move the finished tournaments to the season archives. """
+        tournaments = self.model.archive_finished()
+        self.view.display_archived(tournaments)
+
+    def display_archive(self):
+        """ Display the results and report of an archived tournament. """
+        seasons = sorted({entry['season'] for entry in self.model.archive_index().values()})
+        if not seasons:
+            self.view.display_no_tournament()
+            return
+        season = seasons[0] if len(seasons) == 1 else self.view.get_season(seasons)
+        if self.set_active_tournament(self.model.archived(season)) is None:
+            return
+        players = Player.get_many(self.active_tournament.get_sorted_players())
+        self.view.display_results(players, self.active_tournament)
+        self.view.display_report(self.active_tournament)
+
+    def enter_moves(self):
+        """ Record the moves of a match of the active tournament, asked in
+            SAN again until they are legal. No moves records nothing.
+        """
+        if self.set_active_tournament(self.model.get_ready()) is None:
+            return
+        matchs = [match for round in self.active_tournament.rounds for match in round.matchs]
+        if not matchs:
+            self.view.display_no_match()
+            return
+        match = self.view.get_match(matchs)
+        while True:
+            sans, _ = parse_movetext(self.view.get_moves(match))
+            if not sans:
+                return
+            try:
+                moves = from_san(sans)
+            except ValueError as error:
+                self.view.display_illegal_move(error)
+                continue
+            self.active_tournament.set_moves(match, moves)
+            return
+
+    def display_moves(self):
+        """ Display the moves of a recorded match of the active tournament. """
+        if self.set_active_tournament(self.model.get_ready()) is None:
+            return
+        matchs = [
+            match for round in self.active_tournament.rounds for match in round.matchs if match.game is not None
+        ]
+        if not matchs:
+            self.view.display_moves(None, None)
+            return
+        match = self.view.get_match(matchs)
+        self.view.display_moves(match, format_movetext(to_san(match.moves), match_result(match)))
+
     def set_score(self, match, tournament):
         players = [
             Player.get(match.player_1),
@@ -106,25 +235,25 @@ class TournamentManager(BaseManager):
         ]
         winner = self.view.set_score(players, tournament)
         if winner == 'draw':
-            match.set_score()
+            tournament.set_score(match)
         else:
-            match.set_score(winner)
+            tournament.set_score(match, winner)
 
     def show_all(self):
         tournaments = self.model.all()
         self.view.display_tournaments(tournaments)
 
     def back(self):
-        AppManager(model=None, view=AppView()).start()
+        self.navigator.pop()
 
 
 class AppManager(BaseManager):
 
     def exit(self):
-        exit()
+        self.navigator.clear()
 
     def lunch_player_manager(self):
-        PlayerManager(model=Player, view=PlayerView()).start()
+        self.navigator.push(PlayerManager(model=Player, view=PlayerView()))
 
     def lunch_tournament_manager(self):
-        TournamentManager(model=Tournament, view=TournamentView()).start()
+        self.navigator.push(TournamentManager(model=Tournament, view=TournamentView()))
@@ -0,0 +1,136 @@
+""" Replay a scripted arbiter session without a terminal and report the
+    wall time and storage calls of every menu action.
+
+    The script is a text file holding one answer per line, in the order the
+    application asks for them. Empty lines answer the "Press ENTER" prompts
+    and lines starting with '#' are ignored.
+
+    Usage: python headless.py session.txt [--echo]
+"""
+import argparse
+import time
+from collections import Counter
+from models import base
+from views.base import BaseView, Console
+
+
+class CountingStorage:
+    """ Proxy around a storage backend counting calls by method name. """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.storage, name)
+        if not callable(attribute):
+            return attribute
+
+        def counted(*args, **kwargs):
+            self.calls[name] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+class ScriptedConsole(Console):
+    """ Console reading answers from a list and recording every action run
+        along with its duration and storage calls.
+    """
+
+    def __init__(self, answers, storage, echo=False):
+        self.answers = iter(answers)
+        self.storage = storage
+        self.echo = echo
+        self.records = []
+        self._depth = 0
+
+    def input(self, prompt=''):
+        try:
+            answer = next(self.answers)
+        except StopIteration:
+            raise EOFError('end of script')
+        if self.echo:
+            print(f'{prompt}{answer}')
+        return answer
+
+    def print(self, *args, **kwargs):
+        if self.echo:
+            print(*args, **kwargs)
+
+    def clear(self):
+        pass
+
+    def run_action(self, option):
+        action = option.get('action')
+        record = {
+            'action': getattr(action, '__qualname__', repr(action)),
+            'depth': self._depth,
+        }
+        self.records.append(record)
+        calls = Counter(self.storage.calls)
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            super().run_action(option)
+        finally:
+            self._depth -= 1
+            record['time'] = time.perf_counter() - start
+            record['storage'] = self.storage.calls - calls
+
+
+def read_script(path):
+    """ Return the answers of a session script. """
+    with open(path) as file:
+        return [
+            line.rstrip('\n') for line in file
+            if not line.startswith('#')
+        ]
+
+
+def replay(answers, echo=False):
+    """ Drive the application with answers and return the action records. """
+    from controllers import AppManager
+    from views import AppView
+    storage = base.storage = CountingStorage(base.storage)
+    console = BaseView.console = ScriptedConsole(answers, storage, echo=echo)
+    try:
+        AppManager(model=None, view=AppView()).start()
+    except (EOFError, SystemExit):
+        pass
+    return console.records
+
+
+def report(records):
+    """ Print every action then a summary grouped by action. """
+    print(f"{'action':<45} {'time (ms)':>10}  storage calls")
+    for record in records:
+        name = '  ' * record['depth'] + record['action']
+        calls = ', '.join(f'{k}={v}' for k, v in sorted(record['storage'].items()))
+        print(f"{name:<45} {record['time'] * 1000:>10.2f}  {calls}")
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record['action'], [0, 0.0, Counter()])
+        total[0] += 1
+        total[1] += record['time']
+        total[2] += record['storage']
+    print(f"\n{'action':<45} {'calls':>6} {'total (ms)':>11} {'mean (ms)':>10} {'storage':>8}")
+    for action, (count, elapsed, calls) in sorted(totals.items(), key=lambda x: -x[1][1]):
+        print(
+            f"{action:<45} {count:>6} {elapsed * 1000:>11.2f} "
+            f"{elapsed / count * 1000:>10.2f} {sum(calls.values()):>8}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Replay a scripted session and report action latency.'
+    )
+    parser.add_argument('script')
+    parser.add_argument('--echo', action='store_true', help='show the application output')
+    args = parser.parse_args()
+    report(replay(read_script(args.script), echo=args.echo))
+    lock = base.storage.lock.info()
+    print(
+        f"\nstorage lock: {lock['acquisitions']} acquisitions, {lock['contended']} contended, "
+        f"{lock['wait_time'] * 1000:.2f} ms waited"
+    )
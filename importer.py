@@ -0,0 +1,156 @@
+""" Bulk import of players and match results from csv or jsonl files.
+
+    Players rows hold first_name, last_name, birth_date (dd/mm/yyyy or
+    yyyy-mm-dd), sexe, rank and optionally rating.
+    Results rows hold tournament, round (starting at 1), player_1, player_2
+    and winner (a player id, or 'draw').
+
+    Usage:
+        python importer.py players ratings.csv
+        python importer.py results results.jsonl
+"""
+import argparse
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from models import Player, Tournament
+
+
+BATCH_SIZE = 5000
+
+
+def read_rows(path, errors):
+    """ Yield (line number, row dict) from a csv or jsonl file. Lines that
+        are not a json object are skipped and reported in errors.
+    """
+    with open(path, newline='') as file:
+        if path.endswith('.jsonl'):
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as error:
+                    errors.append(f"line {line_number}: invalid json: {error}")
+                    continue
+                if not isinstance(row, dict):
+                    errors.append(f"line {line_number}: expected a json object")
+                    continue
+                yield line_number, row
+        else:
+            for line_number, row in enumerate(csv.DictReader(file), 2):
+                yield line_number, row
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%d/%m/%Y")
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+
+def build_player(row):
+    """ Return a Player from a row, raising ValueError or TypeError if it
+        is invalid.
+    """
+    try:
+        player = Player(**row)
+    except TypeError as error:
+        raise ValueError(error)
+    if not isinstance(player.birth_date, datetime):
+        player.birth_date = parse_date(player.birth_date)
+    player.rank = int(player.rank)
+    if player.rating not in (None, ''):
+        player.rating = float(player.rating)
+    else:
+        player.rating = None
+    for name in ('first_name', 'last_name', 'sexe'):
+        if not getattr(player, name):
+            raise ValueError(f"missing {name}")
+    return player
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_players(path, batch_size=BATCH_SIZE):
+    """ Stream players from path and insert them batch by batch.
+        Return (number imported, list of errors).
+    """
+    imported, errors = 0, []
+
+    def valid_players():
+        for line_number, row in read_rows(path, errors):
+            try:
+                yield build_player(row)
+            except (TypeError, ValueError) as error:
+                errors.append(f"line {line_number}: {error}")
+
+    for batch in batches(valid_players(), batch_size):
+        Player.insert_many(batch)
+        imported += len(batch)
+    return imported, errors
+
+
+def find_match(tournament, round_number, player_1, player_2):
+    """ Return the match opposing two players in a round of a tournament,
+        rounds being numbered from 1.
+    """
+    if not 1 <= round_number <= len(tournament.rounds):
+        raise ValueError(f"{tournament.name} has no round {round_number}")
+    round = tournament.rounds[round_number - 1]
+    for match in round.matchs:
+        if {match.player_1, match.player_2} == {player_1, player_2}:
+            return match
+    raise ValueError(f"no match between {player_1} and {player_2} in round {round_number}")
+
+
+def import_results(path):
+    """ Apply historical results to existing tournaments, saving each
+        modified tournament once. Return (number imported, list of errors).
+    """
+    imported, errors, modified = 0, [], {}
+    for line_number, row in read_rows(path, errors):
+        try:
+            tournament = Tournament.get(int(row['tournament']))
+            if tournament is None:
+                raise ValueError(f"unknown tournament {row['tournament']}")
+            player_1, player_2 = int(row['player_1']), int(row['player_2'])
+            match = find_match(tournament, int(row['round']), player_1, player_2)
+            winner = str(row.get('winner') or 'draw')
+            winner = None if winner == 'draw' else int(winner)
+            if winner not in (None, player_1, player_2):
+                raise ValueError(f"Player {winner} does not play the match {player_1} VS {player_2}")
+            tournament.settle(match, winner)
+        except (KeyError, TypeError, ValueError) as error:
+            errors.append(f"line {line_number}: {error}")
+            continue
+        modified[tournament.id] = tournament
+        imported += 1
+    for tournament in modified.values():
+        tournament.save()
+    return imported, errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Import players or match results from a csv or jsonl file.'
+    )
+    parser.add_argument('kind', choices=['players', 'results'])
+    parser.add_argument('path')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if args.kind == 'players':
+        imported, errors = import_players(args.path, args.batch_size)
+    else:
+        imported, errors = import_results(args.path)
+    for error in errors:
+        print(error)
+    print(f"{imported} {args.kind} imported, {len(errors)} rejected")
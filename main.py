@@ -1,4 +1,8 @@
+import argparse
+import os
+import profiling
 from controllers import AppManager
+from models import base
 from views import AppView
 
 
@@ -14,6 +18,24 @@ GREETING_MESSAGE = """
 """
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage chess tournaments.')
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='time models and controllers and print a summary at exit'
+    )
+    parser.add_argument(
+        '--profile-action', metavar='ACTION',
+        help='capture a cProfile of a menu action, such as TournamentManager.enter_results'
+    )
+    parser.add_argument(
+        '--database', metavar='PATH',
+        help='database to use instead of settings.DATABASE_NAME, a .json or .sqlite3 file'
+    )
+    args = parser.parse_args()
+    if args.database:
+        base.open_database(args.database)
+    if args.profile or args.profile_action or profiling.enabled_from_environment():
+        profiling.enable(args.profile_action or os.environ.get(profiling.PROFILE_ACTION_ENV))
     print(GREETING_MESSAGE)
     input('Press ENTER to continu')
     app = AppManager(model=None, view=AppView())
@@ -0,0 +1,29 @@
+import argparse
+from models.storage import SQLiteStorage, TinyDBStorage
+
+
+def migrate(source_path, target_path):
+    """ Copy every table of a TinyDB json file into an sqlite database,
+        keeping document ids.
+    """
+    source = TinyDBStorage(source_path)
+    target = SQLiteStorage(target_path)
+    counts = {}
+    for table in source.tables():
+        documents = dict(source.all(table))
+        target.update_many(table, documents)
+        counts[table] = len(documents)
+    source.close()
+    target.close()
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Import an existing json database into sqlite.'
+    )
+    parser.add_argument('source', nargs='?', default='db.json')
+    parser.add_argument('target', nargs='?', default='db.sqlite3')
+    args = parser.parse_args()
+    for table, count in migrate(args.source, args.target).items():
+        print(f'{table}: {count} documents imported')
@@ -1 +1,2 @@
+from .base import StaleObjectError
 from .models import Player, Match, Round, Tournament
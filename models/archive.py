@@ -0,0 +1,131 @@
+import gzip
+import json
+import os
+from settings import ARCHIVE_SUFFIX, DATABASE_NAME
+from .locking import FileLock
+
+
+# Key of the stub documents left in the database in place of the archived
+# tournaments, holding the season they were archived in.
+ARCHIVE_FIELD = '_archive'
+
+
+class TournamentArchive:
+    """ Cold storage of finished tournaments: one gzipped json file per
+        season holding {id: document}, and an index holding the season and
+        header of every archived tournament so that they can be listed
+        without decompressing anything. Seasons are read on demand and
+        kept in memory until their file changes.
+    """
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, directory):
+        self.open(directory)
+
+    def open(self, directory):
+        """ Use the archives stored in directory. """
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self.lock = FileLock(self.index_path)
+        self._index = None
+        self._seasons = {}
+
+    def _season_path(self, season):
+        return os.path.join(self.directory, f'{season}.json.gz')
+
+    @staticmethod
+    def _signature(path):
+        """ Return what changes when a file is replaced, or None if it
+            does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def exists(self):
+        """ Return True if at least one tournament has been archived. """
+        return os.path.exists(self.index_path)
+
+    def index(self):
+        """ Return {tournament id: {'season': season, **header}}. """
+        signature = self._signature(self.index_path)
+        if signature is None:
+            return {}
+        if self._index is None or self._index[0] != signature:
+            with open(self.index_path) as file:
+                index = {int(id): entry for id, entry in json.load(file).items()}
+            self._index = (signature, index)
+        return dict(self._index[1])
+
+    def seasons(self):
+        """ Return the archived seasons in chronological order. """
+        return sorted({entry['season'] for entry in self.index().values()})
+
+    def _documents(self, season):
+        """ Return the {id: document} of a season, reading its file again
+            only if it changed since the last read.
+        """
+        path = self._season_path(season)
+        signature = self._signature(path)
+        if signature is None:
+            return {}
+        cached = self._seasons.get(season)
+        if cached is None or cached[0] != signature:
+            with gzip.open(path, 'rt') as file:
+                documents = {int(id): document for id, document in json.load(file).items()}
+            cached = self._seasons[season] = (signature, documents)
+        return cached[1]
+
+    def get(self, season, id):
+        """ Return the document of an archived tournament. """
+        try:
+            return self._documents(season)[id]
+        except KeyError:
+            raise LookupError(f"Tournament {id} is missing from the {season} archive")
+
+    @staticmethod
+    def _replace(path, write):
+        """ Write a file through a temporary file so that readers never see
+            it partially written.
+        """
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        write(temp_path)
+        os.replace(temp_path, path)
+
+    def store(self, season, tournaments):
+        """ Add tournaments given as {id: (document, header)} to the archive
+            of a season. Storing a tournament again replaces it.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            documents = dict(self._documents(season))
+            index = self.index()
+            for id, (document, header) in tournaments.items():
+                documents[id] = document
+                index[id] = {'season': season, **header}
+
+            def write_season(path):
+                with gzip.open(path, 'wt') as file:
+                    file.write(json.dumps(documents))
+
+            def write_index(path):
+                with open(path, 'w') as file:
+                    file.write(json.dumps(index))
+
+            # The season is written first: an indexed tournament is always
+            # found in its archive.
+            self._replace(self._season_path(season), write_season)
+            self._replace(self.index_path, write_index)
+
+
+def archive_path(database_path):
+    """ Return the archives folder of a database, named after it so that
+        each database of a folder has its own.
+    """
+    return f'{database_path}{ARCHIVE_SUFFIX}'
+
+
+archive = TournamentArchive(archive_path(DATABASE_NAME))
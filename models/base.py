@@ -1,58 +1,290 @@
 from abc import ABC
-from datetime import datetime, timezone
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from dataclass_factory import Schema, Factory
-from tinydb import TinyDB
-from tinydb.table import Document
-from settings import DATABASE_NAME
+from settings import CACHE_SIZE, DATABASE_BACKEND, DATABASE_NAME
+from .archive import archive, archive_path
+from .codec import codec
+from .journal import journal, journal_path
+from .moves import move_archive, moves_path
+from .storage import LazyStorage, backend_for
 
 
-db = TinyDB(DATABASE_NAME)
+# Opened on first query, see open_database to use another database.
+storage = LazyStorage(backend_for(DATABASE_NAME, DATABASE_BACKEND), DATABASE_NAME)
 
-factory = Factory(
-    schemas={
-        datetime: Schema(
-            parser=lambda t: datetime.fromtimestamp(t, tz=timezone.utc),
-            serializer=datetime.timestamp
-        ),
-    }
-)
+
+class IdentityMap:
+    """ Bounded LRU cache of model instances keyed by (model class, id). """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._instances = OrderedDict()
+
+    def get(self, model, id):
+        """ Return the cached instance or None, updating hit/miss counters. """
+        key = (model, id)
+        instance = self._instances.get(key)
+        if instance is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._instances.move_to_end(key)
+        return instance
+
+    def add(self, instance):
+        """ Register an instance, evicting the least recently used one
+            if the map is full.
+        """
+        key = (type(instance), instance.id)
+        self._instances[key] = instance
+        self._instances.move_to_end(key)
+        while len(self._instances) > self.maxsize:
+            self._instances.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._instances
+
+    def discard(self, model, id):
+        """ Remove an instance from the map if present. """
+        self._instances.pop((model, id), None)
+
+    def clear(self):
+        """ Empty the map and reset counters. """
+        self._instances.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        """ Return cache statistics as a dict. """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._instances),
+            'maxsize': self.maxsize,
+        }
+
+
+identity_map = IdentityMap(CACHE_SIZE)
+
+
+def open_database(path, backend=None):
+    """ Use the database stored at path, its backend being guessed from
+        its extension by default, along with the result journal, the
+        archives and the move archive named after it.
+    """
+    storage.open(backend or backend_for(path, DATABASE_BACKEND), path)
+    journal.open(journal_path(path))
+    archive.open(archive_path(path))
+    move_archive.open(moves_path(path))
+    identity_map.clear()
+    for model in BaseModel.__subclasses__():
+        model.clear_caches()
+
+
+# Document key holding the number of times a document has been saved.
+VERSION_FIELD = '_version'
+
+
+class StaleObjectError(Exception):
+    """ Raised when saving an instance which has been saved by another
+        process since it was loaded.
+    """
+    pass
 
 
 @dataclass
 class BaseModel(ABC):
-    """ Abstract class for handling database operations. """
+    """ Abstract class for handling database operations.
+        Every document stores a version, incremented on each save, which
+        lets save() detect the changes made by other processes.
+    """
     id: int = field(default=None, init=False, repr=True)
+    _version = 0
 
     @classmethod
     def _table(cls):
-        """ Return the model's database table. """
-        return db.table(cls.__name__.lower())
+        """ Return the name of the model's database table. """
+        return cls.__name__.lower()
+
+    @classmethod
+    def clear_caches(cls):
+        """ Forget what the model keeps in memory about the database in
+            use, when another one is opened.
+        """
+        pass
+
+    @classmethod
+    def _load(cls, id, data):
+        """ Return the cached instance for id or build it from data. """
+        instance = identity_map.get(cls, id)
+        if instance is None:
+            instance = cls._build(id, data)
+            identity_map.add(instance)
+        elif data.get(VERSION_FIELD, 0) != instance._version:
+            instance._reload(data)
+        return instance
+
+    @classmethod
+    def _build(cls, id, data):
+        """ Deserialize a database document into a model instance. """
+        instance = codec.load(data, cls)
+        instance.id = id
+        instance._version = data.get(VERSION_FIELD, 0)
+        return instance
+
+    def _reload(self, data):
+        """ Replace the fields of the instance by those of a newer document. """
+        self.__dict__.update(type(self)._build(self.id, data).__dict__)
+
+    def refresh(self):
+        """ Reload the instance if another process saved it since it was
+            loaded.
+        """
+        data = storage.get(self._table(), self.id)
+        if data is not None and data.get(VERSION_FIELD, 0) != self._version:
+            self._reload(data)
+        return self
+
+    def evict(self):
+        """ Drop the instance from the identity map, so that the next
+            query builds it again from the database.
+        """
+        identity_map.discard(type(self), self.id)
+
+    def merge(self, data):
+        """ Reconcile the instance with data, the newer document saved by
+            another process, before it is saved on top of it. Models
+            without a merge strategy refuse to overwrite it.
+        """
+        raise StaleObjectError(
+            f"{type(self).__name__} {self.id} was modified by another process"
+        )
 
     @classmethod
     def get(cls, id):
         """ Return model's instance from database by its id"""
-        data = cls._table().get(doc_id=id)
+        instance = identity_map.get(cls, id)
+        if instance is not None:
+            return instance
+        data = storage.get(cls._table(), id)
         if data:
-            instance = factory.load(data, cls)
-            instance.id = id
+            instance = cls._build(id, data)
+            identity_map.add(instance)
             return instance
         return None
 
+    @classmethod
+    def get_many(cls, ids):
+        """ Return a list of instances for the given ids, in the same order,
+            reading the table at most once. Unknown ids are skipped.
+        """
+        ids = list(ids)
+        wanted = {id for id in ids if (cls, id) not in identity_map}
+        documents = storage.get_many(cls._table(), wanted) if wanted else {}
+        instances = []
+        for id in ids:
+            if id in documents:
+                instances.append(cls._load(id, documents[id]))
+            else:
+                instance = identity_map.get(cls, id)
+                if instance is not None:
+                    instances.append(instance)
+        return instances
+
     @classmethod
     def all(cls):
         """ get all objects from database"""
-        return [cls.get(id=entry.doc_id) for entry in cls._table().all()]
+        return [cls._load(id, data) for id, data in storage.all(cls._table())]
+
+    @classmethod
+    def exists(cls):
+        """ Return True if at least one object is stored in database. """
+        return bool(storage.ids(cls._table()))
 
     @property
     def dict(self):
         """ Return model's attributes as dict"""
-        return factory.dump(self)
+        return codec.dump(self)
+
+    def _document(self):
+        """ Return the database document of the instance, without its
+            version.
+        """
+        return self.dict
 
     def save(self):
-        """ Create a new database entry or update an existing one"""
-        if self.id:
-            self._table().upsert(Document(self.dict, doc_id=self.id))
-        else:
-            self.id = self._table().insert(self.dict)
+        """ Create a new database entry or update an existing one. If the
+            entry was saved by another process in the meantime, it is
+            merged first or StaleObjectError is raised, the stale instance
+            being evicted from the identity map.
+        """
+        with storage.lock:
+            if self.id:
+                stored = storage.get(self._table(), self.id)
+                version = stored.get(VERSION_FIELD, 0) if stored else 0
+                if version != self._version:
+                    try:
+                        self.merge(stored)
+                    except StaleObjectError:
+                        self.evict()
+                        raise
+                document = {**self._document(), VERSION_FIELD: version + 1}
+                storage.update(self._table(), self.id, document)
+            else:
+                document = {**self._document(), VERSION_FIELD: 1}
+                self.id = storage.insert(self._table(), document)
+            self._version = document[VERSION_FIELD]
+        identity_map.add(self)
         return self
+
+    @classmethod
+    def insert_many(cls, instances):
+        """ Save several new instances in a single write. """
+        instances = list(instances)
+        ids = storage.insert_many(
+            cls._table(), [{**instance.dict, VERSION_FIELD: 1} for instance in instances]
+        )
+        for instance, id in zip(instances, ids):
+            instance.id = id
+            instance._version = 1
+        return instances
+
+    @classmethod
+    def update_many(cls, instances):
+        """ Save several existing instances in a single write. Raise
+            StaleObjectError, saving nothing and evicting the stale ones
+            from the identity map, if any of them was saved by another
+            process in the meantime.
+        """
+        instances = list(instances)
+        with storage.lock:
+            stored = storage.get_many(cls._table(), [instance.id for instance in instances])
+            stale = [
+                instance.id for instance in instances
+                if stored.get(instance.id, {}).get(VERSION_FIELD, 0) != instance._version
+            ]
+            if stale:
+                for id in stale:
+                    identity_map.discard(cls, id)
+                raise StaleObjectError(
+                    f"{len(stale)} {cls.__name__.lower()}s were modified by another process"
+                )
+            storage.update_many(
+                cls._table(),
+                {instance.id: {**instance.dict, VERSION_FIELD: instance._version + 1} for instance in instances}
+            )
+        for instance in instances:
+            instance._version += 1
+            identity_map.add(instance)
+        return instances
+
+    @staticmethod
+    def cache_info():
+        """ Return hit/miss statistics of the identity map. """
+        return identity_map.info()
+
+    @staticmethod
+    def lock_info():
+        """ Return contention statistics of the storage lock. """
+        return storage.lock.info()
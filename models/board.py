@@ -0,0 +1,341 @@
+import re
+
+# Squares are numbered from 0 (a1) to 63 (h8), rank by rank. White pieces
+# are upper case letters, black pieces lower case ones, empty squares None.
+# Moves are (from square, to square, promotion) tuples, the promotion
+# being one of 'nbrq' or ''.
+FILES = 'abcdefgh'
+PROMOTIONS = 'nbrq'
+INITIAL_RANKS = ['RNBQKBNR', 'P' * 8, *[None] * 4, 'p' * 8, 'rnbqkbnr']
+
+SAN_PATTERN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?$')
+MOVE_PATTERN = re.compile(r'^([a-h][1-8])([a-h][1-8])([nbrq]?)$')
+
+
+def _targets(steps, slide):
+    """ Return for each square the lists of squares reached in each
+        direction of steps, a single one unless slide is True.
+    """
+    targets = []
+    for square in range(64):
+        rays = []
+        for file_step, rank_step in steps:
+            ray = []
+            file, rank = square % 8 + file_step, square // 8 + rank_step
+            while 0 <= file < 8 and 0 <= rank < 8:
+                ray.append(rank * 8 + file)
+                if not slide:
+                    break
+                file, rank = file + file_step, rank + rank_step
+            if ray:
+                rays.append(ray)
+        targets.append(rays)
+    return targets
+
+
+ROOK_RAYS = _targets([(1, 0), (-1, 0), (0, 1), (0, -1)], True)
+BISHOP_RAYS = _targets([(1, 1), (1, -1), (-1, 1), (-1, -1)], True)
+KNIGHT_TARGETS = [[ray[0] for ray in rays] for rays in _targets(
+    [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)], False
+)]
+KING_TARGETS = [[ray[0] for ray in rays] for rays in _targets(
+    [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)], False
+)]
+# Squares attacked by a white and by a black pawn standing on each square.
+PAWN_ATTACKS = {
+    True: [[ray[0] for ray in rays] for rays in _targets([(-1, 1), (1, 1)], False)],
+    False: [[ray[0] for ray in rays] for rays in _targets([(-1, -1), (1, -1)], False)],
+}
+SLIDER_RAYS = {'B': (BISHOP_RAYS,), 'R': (ROOK_RAYS,), 'Q': (BISHOP_RAYS, ROOK_RAYS)}
+# Castling right, king move and the squares which must be empty and safe.
+CASTLINGS = {
+    'K': (4, 6, (5, 6), (4, 5, 6)),
+    'Q': (4, 2, (1, 2, 3), (4, 3, 2)),
+    'k': (60, 62, (61, 62), (60, 61, 62)),
+    'q': (60, 58, (57, 58, 59), (60, 59, 58)),
+}
+# Castling rights lost when a piece leaves or lands on a square.
+CASTLING_SQUARES = {0: 'Q', 4: 'KQ', 7: 'K', 56: 'q', 60: 'kq', 63: 'k'}
+
+
+def square_name(square):
+    return FILES[square % 8] + str(square // 8 + 1)
+
+
+def parse_square(name):
+    return FILES.index(name[0]) + 8 * (int(name[1]) - 1)
+
+
+def move_name(move):
+    """ Return a move in coordinate notation, such as 'e2e4' or 'e7e8q'. """
+    return square_name(move[0]) + square_name(move[1]) + move[2]
+
+
+def parse_move(text):
+    """ Return the move written in coordinate notation in text. """
+    found = MOVE_PATTERN.match(text)
+    if found is None:
+        raise ValueError(f"{text!r} is not a move")
+    return parse_square(found[1]), parse_square(found[2]), found[3]
+
+
+def is_white(piece):
+    return piece.isupper()
+
+
+class Position:
+    """ A chess position with the rules needed to check moves and to
+        read and write them in standard algebraic notation (SAN).
+    """
+
+    def __init__(self, squares, white=True, castling='KQkq', en_passant=None):
+        self.squares = squares
+        self.white = white
+        self.castling = castling
+        self.en_passant = en_passant
+
+    @classmethod
+    def initial(cls):
+        """ Return the starting position. """
+        squares = []
+        for rank in INITIAL_RANKS:
+            squares.extend(rank or [None] * 8)
+        return cls(squares)
+
+    def _own(self, piece):
+        return piece is not None and is_white(piece) == self.white
+
+    def king(self, white):
+        return self.squares.index('K' if white else 'k')
+
+    def attacked(self, square, by_white):
+        """ Return True if a piece of a side attacks square. """
+        squares = self.squares
+        pawn, knight, king = ('P', 'N', 'K') if by_white else ('p', 'n', 'k')
+        # A pawn attacks square from where an enemy pawn on it would attack.
+        if any(squares[other] == pawn for other in PAWN_ATTACKS[not by_white][square]):
+            return True
+        if any(squares[other] == knight for other in KNIGHT_TARGETS[square]):
+            return True
+        if any(squares[other] == king for other in KING_TARGETS[square]):
+            return True
+        for rays, sliders in ((BISHOP_RAYS, 'BQ'), (ROOK_RAYS, 'RQ')):
+            for ray in rays[square]:
+                for other in ray:
+                    piece = squares[other]
+                    if piece is not None:
+                        if is_white(piece) == by_white and piece.upper() in sliders:
+                            return True
+                        break
+        return False
+
+    def in_check(self):
+        """ Return True if the side to move is in check. """
+        return self.attacked(self.king(self.white), not self.white)
+
+    def _pseudo_moves(self, origin):
+        """ Yield the moves of the piece on origin, without checking that
+            they leave its king safe.
+        """
+        squares = self.squares
+        piece = squares[origin]
+        kind = piece.upper()
+        if kind == 'P':
+            step, start, last = (8, 1, 7) if self.white else (-8, 6, 0)
+            targets = []
+            if squares[origin + step] is None:
+                targets.append(origin + step)
+                if origin // 8 == start and squares[origin + 2 * step] is None:
+                    targets.append(origin + 2 * step)
+            for target in PAWN_ATTACKS[self.white][origin]:
+                if target == self.en_passant or (
+                    squares[target] is not None and not self._own(squares[target])
+                ):
+                    targets.append(target)
+            for target in targets:
+                if target // 8 == last:
+                    for promotion in PROMOTIONS:
+                        yield origin, target, promotion
+                else:
+                    yield origin, target, ''
+            return
+        if kind in 'NK':
+            for target in (KNIGHT_TARGETS if kind == 'N' else KING_TARGETS)[origin]:
+                if not self._own(squares[target]):
+                    yield origin, target, ''
+            if kind == 'K':
+                yield from self._castlings(origin)
+            return
+        for rays in SLIDER_RAYS[kind]:
+            for ray in rays[origin]:
+                for target in ray:
+                    if squares[target] is None:
+                        yield origin, target, ''
+                        continue
+                    if not self._own(squares[target]):
+                        yield origin, target, ''
+                    break
+
+    def _castlings(self, origin):
+        for right in (('K', 'Q') if self.white else ('k', 'q')):
+            king, target, empty, safe = CASTLINGS[right]
+            if (
+                right in self.castling and origin == king and
+                all(self.squares[square] is None for square in empty) and
+                not any(self.attacked(square, not self.white) for square in safe)
+            ):
+                yield origin, target, ''
+
+    def push(self, move):
+        """ Return the position after a move, which is not checked. """
+        origin, target, promotion = move
+        squares = list(self.squares)
+        piece = squares[origin]
+        squares[origin] = None
+        if piece in 'Pp' and target == self.en_passant:
+            squares[target - 8 if self.white else target + 8] = None
+        if piece in 'Kk' and abs(target - origin) == 2:
+            rook_origin, rook_target = (origin + 3, origin + 1) if target > origin else (origin - 4, origin - 1)
+            squares[rook_target], squares[rook_origin] = squares[rook_origin], None
+        if promotion:
+            piece = promotion.upper() if self.white else promotion
+        squares[target] = piece
+        castling = self.castling
+        for square in (origin, target):
+            for right in CASTLING_SQUARES.get(square, ''):
+                castling = castling.replace(right, '')
+        en_passant = (origin + target) // 2 if piece in 'Pp' and abs(target - origin) == 16 else None
+        return type(self)(squares, not self.white, castling, en_passant)
+
+    def _is_safe(self, move):
+        """ Return True if a move does not leave the king of its side in
+            check.
+        """
+        after = self.push(move)
+        return not after.attacked(after.king(self.white), after.white)
+
+    def legal_moves(self):
+        """ Return every legal move of the side to move. """
+        return [
+            move
+            for origin, piece in enumerate(self.squares) if self._own(piece)
+            for move in self._pseudo_moves(origin) if self._is_safe(move)
+        ]
+
+    def is_legal(self, move):
+        return (
+            0 <= move[0] < 64 and self._own(self.squares[move[0]]) and
+            move in self._pseudo_moves(move[0]) and self._is_safe(move)
+        )
+
+    def play(self, move):
+        """ Return the position after a move, raising ValueError if it is
+            illegal.
+        """
+        if not self.is_legal(move):
+            raise ValueError(f"{move_name(move)} is illegal")
+        return self.push(move)
+
+    def _origins(self, kind, target):
+        """ Return the squares of the pieces of a kind, other than pawns,
+            of the side to move which may reach target.
+        """
+        piece = kind if self.white else kind.lower()
+        if kind in 'NK':
+            candidates = (KNIGHT_TARGETS if kind == 'N' else KING_TARGETS)[target]
+            return [square for square in candidates if self.squares[square] == piece]
+        origins = []
+        for rays in SLIDER_RAYS[kind]:
+            for ray in rays[target]:
+                for square in ray:
+                    if self.squares[square] is not None:
+                        if self.squares[square] == piece:
+                            origins.append(square)
+                        break
+        return origins
+
+    def parse_san(self, text):
+        """ Return the legal move written in SAN in text, raising
+            ValueError if it is illegal or ambiguous.
+        """
+        san = text.rstrip('+#!?')
+        if san.replace('0', 'O') in ('O-O', 'O-O-O'):
+            origin = 4 if self.white else 60
+            move = (origin, origin + 2 if len(san) == 3 else origin - 2, '')
+        else:
+            found = SAN_PATTERN.match(san)
+            if found is None:
+                raise ValueError(f"{text!r} is not a move")
+            kind, file, rank, capture, target, promotion = found.groups()
+            target = parse_square(target)
+            promotion = (promotion or '').lower()
+            if kind is None:
+                step = 8 if self.white else -8
+                if capture:
+                    if file is None:
+                        raise ValueError(f"{text!r} is not a move")
+                    origin = target - step + FILES.index(file) - target % 8
+                else:
+                    origin = target - step
+                    # A double step if the square behind is empty.
+                    if 0 <= origin - step < 64 and 0 <= origin < 64 and self.squares[origin] is None:
+                        origin -= step
+                move = (origin, target, promotion)
+            else:
+                origins = [
+                    square for square in self._origins(kind, target)
+                    if (file is None or FILES[square % 8] == file) and (rank is None or str(square // 8 + 1) == rank)
+                    and self._is_safe((square, target, ''))
+                ]
+                if len(origins) > 1:
+                    raise ValueError(f"{text!r} is ambiguous")
+                move = (origins[0] if origins else target, target, '')
+        if not self.is_legal(move):
+            raise ValueError(f"{text!r} is illegal")
+        return move
+
+    def san(self, move):
+        """ Return a legal move written in SAN. """
+        origin, target, promotion = move
+        kind = self.squares[origin].upper()
+        if kind == 'K' and abs(target - origin) == 2:
+            text = 'O-O' if target > origin else 'O-O-O'
+        elif kind == 'P':
+            text = square_name(target)
+            if origin % 8 != target % 8:
+                text = f'{FILES[origin % 8]}x{text}'
+            if promotion:
+                text += '=' + promotion.upper()
+        else:
+            others = [
+                square for square in self._origins(kind, target)
+                if square != origin and self._is_safe((square, target, ''))
+            ]
+            prefix = ''
+            if others:
+                if all(square % 8 != origin % 8 for square in others):
+                    prefix = FILES[origin % 8]
+                elif all(square // 8 != origin // 8 for square in others):
+                    prefix = str(origin // 8 + 1)
+                else:
+                    prefix = square_name(origin)
+            capture = 'x' if self.squares[target] is not None else ''
+            text = f'{kind}{prefix}{capture}{square_name(target)}'
+        after = self.push(move)
+        if after.in_check():
+            text += '+' if after.legal_moves() else '#'
+        return text
+
+
+def replay(moves, position=None):
+    """ Check that moves, in coordinate notation, are legal from position,
+        the starting position by default, and return the final position.
+        ValueError gives the number of the first illegal move.
+    """
+    position = position or Position.initial()
+    for ply, text in enumerate(moves):
+        try:
+            position = position.play(parse_move(text))
+        except ValueError as error:
+            raise ValueError(f"move {ply // 2 + 1}{'.' if ply % 2 == 0 else '...'} {error}")
+    return position
@@ -0,0 +1,128 @@
+from dataclasses import MISSING, fields, is_dataclass
+from datetime import datetime, timezone
+from typing import List, Union, get_args, get_origin, get_type_hints
+
+
+NoneType = type(None)
+# Types converted on load, since older documents stored some of them as
+# strings, with the classes of the values they accept as they are (an int
+# being a valid float).
+SCALARS = {int: {int}, float: {float, int}, str: {str}}
+
+
+def load_datetime(value):
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def dump_datetime(value):
+    return value.timestamp()
+
+
+class Codec:
+    """ Convert model instances to and from database documents.
+        A specialized load and dump function is generated once per class,
+        so no type introspection happens when documents are converted.
+        Datetimes are stored as utc timestamps, fields declared with
+        init=False (such as the id) are not stored. Int, float and str
+        fields are converted to their type on load.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._dumpers = {}
+
+    def load(self, data, cls):
+        """ Return an instance of cls built from a document. """
+        loader = self._loaders.get(cls)
+        if loader is None:
+            loader = self._compile(cls)[0]
+        return loader(data)
+
+    def dump(self, obj):
+        """ Return the document of a model instance. """
+        dumper = self._dumpers.get(type(obj))
+        if dumper is None:
+            dumper = self._compile(type(obj))[1]
+        return dumper(obj)
+
+    def _expression(self, kind, annotation, value, namespace):
+        """ Return the source of an expression converting value, of type
+            annotation, for a load or a dump.
+        """
+        origin, args = get_origin(annotation), get_args(annotation)
+        if origin is Union and NoneType in args:
+            inner = [arg for arg in args if arg is not NoneType]
+            converted = self._expression(kind, inner[0], value, namespace)
+            if converted == value:
+                return value
+            return f"(None if {value} is None else {converted})"
+        if origin in (list, List):
+            item = self._expression(kind, args[0], 'item', namespace) if args else 'item'
+            if item == 'item':
+                return f"list({value})"
+            return f"[{item} for item in {value}]"
+        if annotation is datetime:
+            return f"{kind}_datetime({value})"
+        if annotation in SCALARS and kind == 'load':
+            name = annotation.__name__
+            namespace[f'{name}_classes'] = SCALARS[annotation]
+            return f"({value} if {value}.__class__ in {name}_classes else {name}({value}))"
+        if is_dataclass(annotation):
+            self._compile(annotation)
+            name = f"{kind}_{annotation.__name__}"
+            functions = self._loaders if kind == 'load' else self._dumpers
+            namespace[name] = functions[annotation]
+            return f"{name}({value})"
+        return value
+
+    def _compile(self, cls):
+        """ Generate, register and return the load and dump functions of a
+            dataclass.
+        """
+        if cls in self._loaders:
+            return self._loaders[cls], self._dumpers[cls]
+        hints = get_type_hints(cls)
+        namespace = {
+            'cls': cls,
+            'new': object.__new__,
+            'load_datetime': load_datetime,
+            'dump_datetime': dump_datetime,
+        }
+        # Instances are created without calling __init__, every field is
+        # set directly from the document or from its default.
+        load_items, dump_items = [], []
+        for field in fields(cls):
+            key = repr(field.name)
+            if field.default is not MISSING:
+                namespace[f'default_{field.name}'] = field.default
+                default = f'default_{field.name}'
+            elif field.default_factory is not MISSING:
+                namespace[f'factory_{field.name}'] = field.default_factory
+                default = f'factory_{field.name}()'
+            else:
+                default = None
+            if not field.init:
+                load_items.append(f"{key}: {default}")
+                continue
+            converted = self._expression('load', hints[field.name], f"data[{key}]", namespace)
+            if default is None:
+                load_items.append(f"{key}: {converted}")
+            else:
+                load_items.append(f"{key}: {converted} if {key} in data else {default}")
+            dump_items.append(
+                f"{key}: {self._expression('dump', hints[field.name], f'obj.{field.name}', namespace)}"
+            )
+        load_lines = [
+            "def load(data):",
+            "    obj = new(cls)",
+            "    obj.__dict__.update({" + ", ".join(load_items) + "})",
+            "    return obj",
+        ]
+        dump_lines = ["def dump(obj):", "    return {" + ", ".join(dump_items) + "}"]
+        exec("\n".join(load_lines + dump_lines), namespace)
+        self._loaders[cls] = namespace['load']
+        self._dumpers[cls] = namespace['dump']
+        return namespace['load'], namespace['dump']
+
+
+codec = Codec()
@@ -0,0 +1,248 @@
+import random
+from collections import Counter
+from settings import BYE_SCORE, DEFAULT_RATING, DRAW_RATE, FORECAST_GAMES, FORECAST_SIMULATIONS, TIEBREAKS
+from .models import Player
+from .pairing import SwissPairing, colour_balance
+from .rating import expected_score
+
+
+# Simulations are split in chunks of fixed size, each seeded from its index,
+# so results only depend on the seed and not on the number of processes.
+CHUNK_SIZE = 100
+# Fewest simulations run for a large field.
+MIN_SIMULATIONS = 1000
+# Below this number of simulated games in all, starting a process pool
+# costs more than it saves.
+PARALLEL_GAMES = 200000
+
+
+def rating_of(player):
+    """ Return the rating of a player, estimated from its rank when the
+        player has not been rated yet.
+    """
+    if player.rating is not None:
+        return player.rating
+    return DEFAULT_RATING - 10 * (int(player.rank) - 1)
+
+
+def outcome_limits(rating_1, rating_2):
+    """ Return the random rolls under which the first player wins and
+        draws, from the Elo expected score and the draw rate.
+    """
+    expected = expected_score(rating_1, rating_2)
+    draw = min(DRAW_RATE, 2 * min(expected, 1 - expected))
+    return expected - draw / 2, expected + draw / 2
+
+
+def tiebreak_values(player, scores, games, weighted, nb_rounds):
+    """ Return the tie-breaks of a player, as TiebreakIndex computes them,
+        from its (opponent, result) games and the sum of its round scores
+        weighted by round number.
+    """
+    return {
+        'buchholz': sum(scores[opponent] for opponent, _ in games),
+        'sonneborn_berger': sum(result * scores[opponent] for opponent, result in games),
+        'progressive': (nb_rounds + 1) * scores[player] - weighted,
+    }
+
+
+def final_standings(state, scores, played, byes, top):
+    """ Return the players who may finish in the top places, ordered like
+        Tournament.get_sorted_players: by score, TIEBREAKS then rank. Only
+        their tie-breaks are computed, from the games of the tournament and
+        the played (round index, white, black, score of white) and byes
+        (round index, player) of a simulation.
+    """
+    standings = sorted(state['by_rank'], key=scores.__getitem__, reverse=True)
+    count = min(top, len(standings))
+    cutoff = scores[standings[count - 1]]
+    while count < len(standings) and scores[standings[count]] == cutoff:
+        count += 1
+    games = {player: list(state['games'][player]) for player in standings[:count]}
+    weighted = {player: state['weighted'][player] for player in games}
+    for round_index, white, black, score in played:
+        if white in games:
+            games[white].append((black, score))
+            weighted[white] += score * (round_index + 1)
+        if black in games:
+            games[black].append((white, 1 - score))
+            weighted[black] += (1 - score) * (round_index + 1)
+    for round_index, player in byes:
+        if player in games:
+            weighted[player] += BYE_SCORE * (round_index + 1)
+    ranks, nb_rounds = state['ranks'], state['nb_rounds']
+
+    def key(player):
+        values = tiebreak_values(player, scores, games[player], weighted[player], nb_rounds)
+        return (scores[player], *(values[name] for name in TIEBREAKS), -ranks[player])
+    return sorted(games, key=key, reverse=True)
+
+
+def simulate_chunk(state, seed, count, top):
+    """ Simulate count times the end of a tournament and return how many
+        times each player finished first and in the top places.
+    """
+    rng = random.Random(seed)
+    roll = rng.random
+    ratings, by_rank = state['ratings'], state['by_rank']
+    first_round = state['next_round']
+    outcomes = {}
+
+    def play(white, black):
+        """ Return the simulated score of white. """
+        limit = outcomes.get((white, black))
+        if limit is None:
+            limit = outcomes[white, black] = outcome_limits(ratings[white], ratings[black])
+        value = roll()
+        return 1 if value < limit[0] else 0.5 if value < limit[1] else 0
+
+    firsts, tops = Counter(), Counter()
+    for _ in range(count):
+        scores = dict(state['scores'])
+        # Copy on write: the opponents of a player are the frozenset of the
+        # state until a simulated game adds one. Balances and last colours
+        # are immutable values.
+        opponents = dict(state['opponents'])
+        balances, colours = dict(state['balances']), dict(state['colours'])
+        byes = set(state['byes'])
+        played, byes_given = [], []
+        for round_index, player_1, player_2 in state['pending']:
+            score = play(player_1, player_2)
+            scores[player_1] += score
+            scores[player_2] += 1 - score
+            played.append((round_index, player_1, player_2, score))
+        for round_index in range(first_round, first_round + state['remaining_rounds']):
+            standings = sorted(by_rank, key=scores.__getitem__, reverse=True)
+            pairs, bye = SwissPairing(standings, scores, opponents, colours, byes, balances).pair()
+            for white, black in pairs:
+                score = play(white, black)
+                scores[white] += score
+                scores[black] += 1 - score
+                played.append((round_index, white, black, score))
+                met = opponents[white]
+                if met.__class__ is frozenset:
+                    met = opponents[white] = set(met)
+                met.add(black)
+                met = opponents[black]
+                if met.__class__ is frozenset:
+                    met = opponents[black] = set(met)
+                met.add(white)
+                balances[white] += 1
+                balances[black] -= 1
+                colours[white], colours[black] = 'w', 'b'
+            if bye is not None:
+                scores[bye] += BYE_SCORE
+                byes.add(bye)
+                byes_given.append((round_index, bye))
+        standings = final_standings(state, scores, played, byes_given, top)
+        firsts[standings[0]] += 1
+        tops.update(standings[:top])
+    return firsts, tops
+
+
+class Forecast:
+    """ Monte Carlo forecast of the final standings of a running tournament.
+        The remaining games are simulated with Elo win and draw
+        probabilities, the remaining rounds being paired like real ones
+        from the scores and ranks, and the final standings broken by the
+        TIEBREAKS.
+    """
+
+    def __init__(self, state):
+        self.state = state
+
+    @classmethod
+    def from_tournament(cls, tournament):
+        """ Capture the current state of a tournament as plain data, so it
+            can be sent to worker processes.
+        """
+        players = Player.get_many(tournament.players)
+        ranks = {player.id: int(player.rank) for player in players}
+        opponents, colours, byes = tournament.pairing_history()
+        games = {player: [] for player in tournament.players}
+        weighted = dict.fromkeys(tournament.players, 0)
+        pending = []
+        for round_index, round in enumerate(tournament.rounds):
+            for match in round.matchs:
+                if not match.is_finished:
+                    pending.append((round_index, match.player_1, match.player_2))
+                    continue
+                for player, opponent, score in (
+                    (match.player_1, match.player_2, match.score_player_1),
+                    (match.player_2, match.player_1, match.score_player_2),
+                ):
+                    games[player].append((opponent, score))
+                    weighted[player] += score * (round_index + 1)
+            if round.bye is not None:
+                weighted[round.bye] += BYE_SCORE * (round_index + 1)
+        return cls({
+            'scores': dict(tournament.scores),
+            'ratings': {player.id: rating_of(player) for player in players},
+            'ranks': ranks,
+            'by_rank': sorted(tournament.players, key=ranks.__getitem__),
+            'opponents': {player: frozenset(others) for player, others in opponents.items()},
+            'balances': {player: colour_balance(history) for player, history in colours.items()},
+            'colours': {player: history[-1] for player, history in colours.items() if history},
+            'byes': byes,
+            'games': games,
+            'weighted': weighted,
+            'pending': pending,
+            'next_round': len(tournament.rounds),
+            'remaining_rounds': tournament.nb_rounds - len(tournament.rounds),
+            'nb_rounds': tournament.nb_rounds,
+        })
+
+    @property
+    def games_per_simulation(self):
+        """ Return the number of games a simulation plays. """
+        state = self.state
+        return len(state['pending']) + len(state['scores']) // 2 * state['remaining_rounds']
+
+    def nb_simulations(self, maximum=FORECAST_SIMULATIONS, games=FORECAST_GAMES):
+        """ Return the number of simulations to run: maximum, or fewer for
+            a large field so that about games games are simulated in all.
+        """
+        return min(maximum, max(MIN_SIMULATIONS, games // max(1, self.games_per_simulation)))
+
+    def run(self, simulations, top=3, seed=0, workers=None, progress=None):
+        """ Return {player id: (probability of finishing first, probability
+            of finishing in the top places)}. workers is the number of
+            processes, 1 runs in the current process, by default one per
+            processor unless there are few games to simulate. progress, if
+            given, is called with the number of simulations done and the
+            total after each chunk.
+        """
+        chunks = [
+            (seed + index, min(CHUNK_SIZE, simulations - start))
+            for index, start in enumerate(range(0, simulations, CHUNK_SIZE))
+        ]
+        if workers is None and simulations * self.games_per_simulation < PARALLEL_GAMES:
+            workers = 1
+        firsts, tops = Counter(), Counter()
+
+        def collect(results):
+            done = 0
+            for (_, count), (chunk_firsts, chunk_tops) in zip(chunks, results):
+                firsts.update(chunk_firsts)
+                tops.update(chunk_tops)
+                done += count
+                if progress:
+                    progress(done, simulations)
+
+        if workers == 1:
+            collect(simulate_chunk(self.state, chunk_seed, count, top) for chunk_seed, count in chunks)
+        else:
+            # Imported here as it is slow to import and rarely needed.
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                collect(executor.map(
+                    simulate_chunk,
+                    [self.state] * len(chunks),
+                    [chunk_seed for chunk_seed, _ in chunks],
+                    [count for _, count in chunks],
+                    [top] * len(chunks),
+                ))
+        return {
+            player: (firsts[player] / simulations, tops[player] / simulations)
+            for player in self.state['scores']
+        }
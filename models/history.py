@@ -0,0 +1,105 @@
+from collections import defaultdict
+from . import base
+from .rating import performance_rating
+
+
+class GameHistory:
+    """ Index of the finished games of every player, stored in its own
+        table: one document per player holding {tournament id: [[round
+        index, opponent, score], ...]}. It is updated for the players of a
+        tournament each time the tournament is saved, so the games of a
+        player are read without loading any tournament.
+        A marker document records that the index has been built, as
+        databases created before it hold tournaments missing from it.
+    """
+
+    TABLE = 'player_games'
+    MARKER_ID = 0
+
+    @staticmethod
+    def tournament_games(tournament):
+        """ Return the finished games of a tournament by player. """
+        games = defaultdict(list)
+        for round_index, round in enumerate(tournament.rounds):
+            for match in round.matchs:
+                if match.is_finished:
+                    games[match.player_1].append([round_index, match.player_2, match.score_player_1])
+                    games[match.player_2].append([round_index, match.player_1, match.score_player_2])
+        return games
+
+    def _entries(self, tournaments):
+        """ Return {player: {tournament id: games}} for tournaments. """
+        entries = defaultdict(dict)
+        for tournament in tournaments:
+            games = self.tournament_games(tournament)
+            for player in tournament.players:
+                entries[player][str(tournament.id)] = games.get(player, [])
+        return entries
+
+    def record(self, tournaments):
+        """ Replace the games of tournaments in the documents of their
+            players, writing only the documents which changed. Nothing is
+            recorded until the index has been built.
+        """
+        entries = self._entries(tournaments)
+        with base.storage.lock:
+            stored = base.storage.get_many(self.TABLE, [self.MARKER_ID, *entries])
+            if self.MARKER_ID not in stored:
+                return
+            changed = {}
+            for player, games in entries.items():
+                document = stored.get(player, {})
+                updated = {**document, **games}
+                updated = {id: player_games for id, player_games in updated.items() if player_games}
+                if updated != document:
+                    changed[player] = updated
+            base.storage.update_many(self.TABLE, changed)
+
+    def build(self, tournaments):
+        """ Index every game of tournaments and mark the index as built. """
+        entries = self._entries(tournaments)
+        documents = {
+            player: {id: player_games for id, player_games in games.items() if player_games}
+            for player, games in entries.items()
+        }
+        with base.storage.lock:
+            base.storage.update_many(self.TABLE, {
+                **{player: document for player, document in documents.items() if document},
+                self.MARKER_ID: {'built': True},
+            })
+
+    def games(self, player):
+        """ Return the indexed games of a player as {tournament id: [[round
+            index, opponent, score], ...]}, or None if the index has not
+            been built.
+        """
+        stored = base.storage.get_many(self.TABLE, [self.MARKER_ID, player])
+        if self.MARKER_ID not in stored:
+            return None
+        return {int(id): games for id, games in stored.get(player, {}).items()}
+
+
+class PlayerStatistics:
+    """ Career statistics of a player computed from its games, given as
+        (tournament id, round index, opponent, score) tuples, and from the
+        {player id: rating} of its opponents.
+    """
+
+    def __init__(self, games, ratings):
+        self.games = games
+        self.nb_games = len(games)
+        self.wins = sum(1 for game in games if game[3] == 1)
+        self.draws = sum(1 for game in games if game[3] == 0.5)
+        self.losses = self.nb_games - self.wins - self.draws
+        self.score = sum(game[3] for game in games)
+        self.percentage = self.score / self.nb_games if self.nb_games else 0
+        head_to_head = defaultdict(lambda: [0, 0])
+        for _, _, opponent, score in games:
+            head_to_head[opponent][0] += 1
+            head_to_head[opponent][1] += score
+        # Most played opponents first.
+        self.head_to_head = dict(sorted(head_to_head.items(), key=lambda x: (-x[1][0], x[0])))
+        self.performance = performance_rating([ratings[game[2]] for game in games], self.score)
+
+
+history = GameHistory()
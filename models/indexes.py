@@ -0,0 +1,99 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class SortedIndex:
+    """ In-memory secondary index keeping (key, id) pairs sorted, where key
+        is computed from a database document by the given function.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._entries = []
+        self._keys = {}
+
+    def build(self, documents):
+        """ Index an iterable of (id, document) tuples. """
+        self._keys = {id: self.key(document) for id, document in documents}
+        self._entries = sorted((key, id) for id, key in self._keys.items())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, id, document):
+        """ Index a new document or move an existing one to its new key. """
+        key = self.key(document)
+        old_key = self._keys.get(id)
+        if id in self._keys:
+            if old_key == key:
+                return
+            position = bisect_left(self._entries, (old_key, id))
+            del self._entries[position]
+        self._keys[id] = key
+        insort(self._entries, (key, id))
+
+    def ids(self, start=0, stop=None):
+        """ Return ids ordered by key, sliced from start to stop. """
+        return [id for _, id in self._entries[start:stop]]
+
+    def page(self, number, size):
+        """ Return the ids of the page number (starting at 0). """
+        return self.ids(number * size, (number + 1) * size)
+
+    def range(self, low, high):
+        """ Return ids whose key is between low and high, both included. """
+        start = bisect_left(self._entries, (low,))
+        stop = bisect_right(self._entries, (high, float('inf')))
+        return self.ids(start, stop)
+
+    def position(self, id):
+        """ Return the position of an indexed id in key order. """
+        return bisect_left(self._entries, (self._keys[id], id))
+
+    def select(self, low=None, high=None, exclude=(), load=None):
+        """ Return an IndexSlice of the ids whose key is from low included
+            to high excluded, leaving out the ids of exclude. Keys are
+            compared as tuples, so a shorter low or high bounds every key
+            it is a prefix of.
+        """
+        start = 0 if low is None else bisect_left(self._entries, (low,))
+        stop = len(self._entries) if high is None else bisect_left(self._entries, (high,))
+        return IndexSlice(self, start, stop, exclude, load)
+
+
+class IndexSlice:
+    """ Ids of a SortedIndex between two positions, minus excluded ids,
+        read page by page without copying the range. load, if given, is
+        applied to the ids of each page, to return model instances.
+    """
+
+    def __init__(self, index, start, stop, exclude=(), load=None):
+        self.index = index
+        self.start = start
+        self.stop = max(start, stop)
+        self.load = load
+        self._excluded_ids = {id for id in exclude if id in index._keys}
+        self._excluded = sorted(
+            position for position in map(index.position, self._excluded_ids)
+            if self.start <= position < self.stop
+        )
+
+    def __len__(self):
+        return self.stop - self.start - len(self._excluded)
+
+    def page(self, number, size):
+        """ Return the ids, or the loaded objects, of the page number
+            (starting at 0).
+        """
+        # Skip the excluded positions before the first id of the page.
+        position = self.start + number * size
+        for excluded in self._excluded:
+            if excluded > position:
+                break
+            position += 1
+        ids = []
+        while position < self.stop and len(ids) < size:
+            id = self.index._entries[position][1]
+            if id not in self._excluded_ids:
+                ids.append(id)
+            position += 1
+        return self.load(ids) if self.load else ids
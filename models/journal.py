@@ -0,0 +1,132 @@
+import json
+import os
+import uuid
+from collections import defaultdict
+from settings import DATABASE_NAME, JOURNAL_SUFFIX
+from .locking import FileLock
+
+
+# Document key holding the id of the last journal event a tournament
+# snapshot includes.
+JOURNAL_FIELD = '_journal'
+
+
+class ResultJournal:
+    """ Append-only log of match results, one json line per event.
+        Events are kept until the tournament they belong to is saved as a
+        whole, at which point they are dropped from the journal. Each event
+        has an id, so that a snapshot tells which events it includes.
+        Several processes may share the journal: reads pick up the lines
+        appended since the previous read, writes hold a file lock.
+    """
+
+    def __init__(self, path):
+        self.open(path)
+
+    def open(self, path):
+        """ Use the journal stored at path. """
+        self.path = path
+        self.lock = FileLock(path)
+        self._events = None
+        self._inode = None
+        self._offset = 0
+
+    def _load(self):
+        """ Index by tournament the events appended since the last call,
+            reading the file again from the start if it was rewritten.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        if (
+            self._events is None or stat is None or
+            stat.st_ino != self._inode or stat.st_size < self._offset
+        ):
+            self._events = defaultdict(list)
+            self._inode = stat.st_ino if stat else None
+            self._offset = 0
+        if stat is None or stat.st_size == self._offset:
+            return self._events
+        with open(self.path, 'rb') as file:
+            file.seek(self._offset)
+            data = file.read()
+        # Leave a line still being written for the next read.
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # Partial line left by an interrupted write.
+                continue
+            self._events[event['tournament']].append(event)
+        self._offset += end
+        return self._events
+
+    def __len__(self):
+        return sum(len(events) for events in self._load().values())
+
+    def tournaments(self):
+        """ Return the ids of tournaments having pending events. """
+        return [id for id, events in self._load().items() if events]
+
+    def events(self, tournament_id, after=None):
+        """ Return the pending events of a tournament in write order, only
+            those following the event with id after if it is still in the
+            journal.
+        """
+        return events_after(list(self._load().get(tournament_id, ())), after)
+
+    def append(self, tournament_id, round_index, match_index, score_player_1, score_player_2):
+        """ Durably record the score of a single match. """
+        event = {
+            'id': uuid.uuid4().hex,
+            'tournament': tournament_id,
+            'round': round_index,
+            'match': match_index,
+            'score_player_1': score_player_1,
+            'score_player_2': score_player_2,
+        }
+        with self.lock:
+            with open(self.path, 'a') as file:
+                file.write(json.dumps(event) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+
+    def discard(self, tournament_id):
+        """ Drop the events of a tournament once it has been snapshotted. """
+        with self.lock:
+            events = self._load()
+            if not events.pop(tournament_id, None):
+                return
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as file:
+                for pending in events.values():
+                    for event in pending:
+                        file.write(json.dumps(event) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            stat = os.stat(self.path)
+            self._inode, self._offset = stat.st_ino, stat.st_size
+
+
+def events_after(events, id):
+    """ Return the events following the one with id, or all of them if
+        it is not among them.
+    """
+    if id is not None:
+        for index, event in enumerate(events):
+            if event.get('id') == id:
+                return events[index + 1:]
+    return events
+
+
+def journal_path(database_path):
+    """ Return the path of the journal of a database, named after it so
+        that each database of a folder has its own.
+    """
+    return f'{database_path}{JOURNAL_SUFFIX}'
+
+
+journal = ResultJournal(journal_path(DATABASE_NAME))
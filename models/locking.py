@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, lock a byte of the file instead.
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """ Exclusive lock shared by every process using the same file, held on
+        a '<path>.lock' file next to it. The lock is reentrant inside a
+        process and keeps contention statistics.
+    """
+
+    def __init__(self, path):
+        self.path = f'{path}.lock'
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self._file = None
+        self._pid = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def _open(self):
+        # A forked child shares the descriptor, and so the lock, of its
+        # parent: it needs its own.
+        if self._file is None or self._pid != os.getpid():
+            self._file = open(self.path, 'a+')
+            self._pid = os.getpid()
+
+    def _lock(self, blocking):
+        """ Lock the file and return True, or False if it is held by another
+            process and blocking is False.
+        """
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
+        while True:
+            self._file.seek(0)
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.001)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth > 1:
+            return
+        try:
+            self._open()
+            if not self._lock(blocking=False):
+                self.contended += 1
+                start = time.perf_counter()
+                self._lock(blocking=True)
+                waited = time.perf_counter() - start
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+        except BaseException:
+            self._depth -= 1
+            self._thread_lock.release()
+            raise
+        self.acquisitions += 1
+
+    def release(self):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                self._unlock()
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def info(self):
+        """ Return contention statistics as a dict. """
+        return {
+            'acquisitions': self.acquisitions,
+            'contended': self.contended,
+            'wait_time': self.wait_time,
+            'max_wait': self.max_wait,
+        }
@@ -1,7 +1,19 @@
+from collections import defaultdict
 from datetime import datetime
 from dataclasses import dataclass, field
 from typing import List, Optional
-from .base import BaseModel
+from settings import BYE_SCORE, DEFAULT_RATING, JOURNAL_COMPACT_THRESHOLD, TIEBREAKS
+from . import base
+from .archive import ARCHIVE_FIELD, archive
+from .base import VERSION_FIELD, BaseModel, StaleObjectError
+from .board import replay
+from .history import PlayerStatistics, history
+from .indexes import SortedIndex
+from .journal import JOURNAL_FIELD, events_after, journal
+from .moves import move_archive
+from .pairing import SwissPairing
+from .rating import EloRating, collect_games, ranks_from_ratings
+from .tiebreaks import TiebreakIndex
 
 
 @dataclass
@@ -11,10 +23,161 @@ class Player(BaseModel):
     birth_date: datetime
     sexe: str
     rank: int
+    rating: Optional[float] = None
+
+    _indexes = None
+    # Version of each indexed document, to notice the players added or
+    # saved by other processes.
+    _indexed_versions = None
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    @staticmethod
+    def _rank_key(document):
+        try:
+            return int(document['rank'])
+        except (TypeError, ValueError):
+            return float('inf')
+
+    @staticmethod
+    def _name_key(document):
+        return (document['last_name'].lower(), document['first_name'].lower())
+
+    @classmethod
+    def indexes(cls):
+        """ Return the rank and name indexes, built from the raw documents
+            on first use then maintained by save(). They are built again if
+            other processes added or saved players since, which only the
+            versions of the documents are read to check.
+        """
+        if cls._indexes is None or base.storage.values(cls._table(), VERSION_FIELD) != cls._indexed_versions:
+            documents = base.storage.all(cls._table())
+            indexes = {'rank': SortedIndex(cls._rank_key), 'name': SortedIndex(cls._name_key)}
+            for index in indexes.values():
+                index.build(documents)
+            cls._indexes = indexes
+            cls._indexed_versions = {id: document.get(VERSION_FIELD) for id, document in documents}
+        return cls._indexes
+
+    @classmethod
+    def clear_caches(cls):
+        cls._indexes = cls._indexed_versions = None
+
+    @classmethod
+    def get_page(cls, ids):
+        """ Return the players of a page of an index, as get_many, reading
+            again those saved by other processes since they were loaded.
+        """
+        players = cls.get_many(ids)
+        versions = base.storage.values(cls._table(), VERSION_FIELD)
+        stale = [player.id for player in players if (versions.get(player.id) or 0) != player._version]
+        if stale:
+            for id, document in base.storage.get_many(cls._table(), stale).items():
+                cls._load(id, document)
+        return players
+
+    @classmethod
+    def by_rank(cls, low, high):
+        """ Return the players whose rank is between low and high. """
+        return cls.get_many(cls.indexes()['rank'].range(low, high))
+
+    @classmethod
+    def search(cls, query='', exclude=()):
+        """ Return the players matching query as an IndexSlice of Player
+            instances, leaving out the ids of exclude:
+            - '#12' lists players by rank, from rank 12.
+            - 'dup' lists players by name, whose last name starts with dup.
+            - 'dupont, je' also requires the first name to start with je.
+            - an empty query lists every player by name.
+        """
+        query = query.strip().lower()
+        if query.startswith('#') and query[1:].isdigit():
+            return cls.indexes()['rank'].select(low=int(query[1:]), exclude=exclude, load=cls.get_page)
+        if not query:
+            return cls.indexes()['name'].select(exclude=exclude, load=cls.get_page)
+        words = tuple(word.strip() for word in query.split(',', 1))
+        # '\uffff' sorts after any character a name may continue with.
+        high = (*words[:-1], words[-1] + '\uffff')
+        return cls.indexes()['name'].select(low=words, high=high, exclude=exclude, load=cls.get_page)
+
+    def _update_indexes(self):
+        if Player._indexes is not None:
+            document = self.dict
+            for index in Player._indexes.values():
+                index.update(self.id, document)
+            Player._indexed_versions[self.id] = self._version
+
+    def save(self):
+        super().save()
+        self._update_indexes()
+        return self
+
+    @classmethod
+    def insert_many(cls, instances):
+        instances = super().insert_many(instances)
+        for instance in instances:
+            instance._update_indexes()
+        return instances
+
+    @classmethod
+    def update_many(cls, instances):
+        instances = super().update_many(instances)
+        for instance in instances:
+            instance._update_indexes()
+        return instances
+
+    @classmethod
+    def update_ratings(cls, engine=None):
+        """ Recompute every rating from the finished matchs of all
+            tournaments, then rank players by rating. If the save fails,
+            the previous ratings and ranks are restored.
+        """
+        engine = engine or EloRating()
+        ratings = engine.recompute(collect_games(Tournament.all() + Tournament.archived()))
+        players = cls.all()
+        ratings = {player.id: round(ratings.get(player.id, engine.default), 1) for player in players}
+        ranks = ranks_from_ratings(ratings)
+        previous = [(player, player.rating, player.rank) for player in players]
+        for player in players:
+            player.rating, player.rank = ratings[player.id], ranks[player.id]
+        try:
+            return cls.update_many(players)
+        except Exception:
+            for player, rating, rank in previous:
+                player.rating, player.rank = rating, rank
+            raise
+
+    def games(self):
+        """ Return the finished games of the player as (tournament id, round
+            index, opponent, score) tuples, read from the game history along
+            with the results still in the journal. The history is built on
+            first use.
+        """
+        games = history.games(self.id)
+        if games is None:
+            history.build(Tournament.get_many(base.storage.ids(Tournament._table())))
+            games = history.games(self.id)
+        for tournament in Tournament.get_many(journal.tournaments()):
+            if tournament.is_enrolled(self):
+                games[tournament.id] = history.tournament_games(tournament).get(self.id, [])
+        return [
+            (tournament_id, *game)
+            for tournament_id in sorted(games) for game in games[tournament_id]
+        ]
+
+    def statistics(self):
+        """ Return the PlayerStatistics of the player, reading only its
+            games and its opponents.
+        """
+        games = self.games()
+        opponents = {game[2] for game in games}
+        ratings = dict.fromkeys(opponents, DEFAULT_RATING)
+        ratings.update(
+            (opponent.id, opponent.rating) for opponent in Player.get_many(opponents) if opponent.rating is not None
+        )
+        return PlayerStatistics(games, ratings)
+
 
 @dataclass
 class Match(BaseModel):
@@ -22,6 +185,8 @@ class Match(BaseModel):
     player_2: int
     score_player_1: float = 0
     score_player_2: float = 0
+    # Id of the moves of the match in the move archive, if recorded.
+    game: Optional[int] = None
 
     def __str__(self):
         return "%s: %s VS %s: %s" % (
@@ -40,6 +205,15 @@ class Match(BaseModel):
             return True
         return False
 
+    @property
+    def moves(self):
+        """ Return the recorded moves of the match in coordinate notation,
+            white being player_1.
+        """
+        if self.game is None:
+            return []
+        return move_archive.get(self.game)
+
     def set_score(self, winner=None):
         """ Set score to 1 for winning player or 0.5 for both players
             if draw.
@@ -70,6 +244,7 @@ class Round(BaseModel):
     matchs: List[Match] = field(default_factory=list)
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    bye: Optional[int] = None
 
     def __str__(self):
         return f"Round {self.index}"
@@ -85,12 +260,7 @@ class Round(BaseModel):
 
     def get_active_match(self):
         """ Return the first match of the round which is not finished. """
-        pending_matchs = [
-            match for match in self.matchs if not match.is_finished
-        ]
-        if pending_matchs:
-            return pending_matchs[0]
-        return None
+        return next((match for match in self.matchs if not match.is_finished), None)
 
 
 @dataclass
@@ -100,29 +270,103 @@ class Tournament(BaseModel):
     players: List[int] = field(default_factory=list)
     rounds: List[Round] = field(default_factory=list)
     start_date: Optional[datetime] = None
+    nb_players: Optional[int] = None
+
+    HEADER_TABLE = 'tournament_header'
+    LAZY_FIELDS = ('players', 'rounds', 'start_date')
+    # Number of journal events of the tournament the instance has applied,
+    # and id of the last one.
+    _journaled = 0
+    _folded = None
 
     def __str__(self):
         if not self.is_ready:
             return "%s (%s/%s) players" % (
                 self.name,
-                len(self.players),
-                self.nb_rounds * 2
+                self.nb_enrolled,
+                self.max_players
             )
         elif not self.is_finished:
             return "%s (%s/%s rounds)" % (
                 self.name,
-                len(self.rounds),
+                self.nb_played_rounds,
                 self.nb_rounds
             )
         else:
             return "%s (finished)" % self.name
 
+    def __getattr__(self, name):
+        """ Load the full tournament the first time a field missing from
+            its header is accessed.
+        """
+        if name in self.LAZY_FIELDS and 'id' in self.__dict__:
+            self._materialize()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    @property
+    def is_loaded(self):
+        """ Return False if only the header of the tournament is loaded. """
+        return 'rounds' in self.__dict__
+
+    def _materialize(self):
+        """ Fill a header-only tournament with its players and rounds. """
+        full = type(self)._build(self.id, base.storage.get(self._table(), self.id))
+        for name in self.LAZY_FIELDS:
+            self.__dict__.setdefault(name, full.__dict__[name])
+        self._version, self._journaled, self._folded = full._version, full._journaled, full._folded
+        if full.is_archived:
+            self._archive = full._archive
+
+    @classmethod
+    def _from_header(cls, id, header):
+        """ Return the tournament of the identity map or a lightweight
+            instance holding only its header. A header-only instance of the
+            identity map takes the header just read, which another terminal
+            may have changed.
+        """
+        instance = base.identity_map.get(cls, id)
+        if instance is not None and instance.is_loaded:
+            return instance
+        if instance is None:
+            instance = object.__new__(cls)
+        instance.__dict__.update(
+            id=id,
+            name=header['name'],
+            nb_rounds=header['nb_rounds'],
+            nb_players=header['nb_players'],
+            _header=header,
+        )
+        base.identity_map.add(instance)
+        return instance
+
+    @property
+    def nb_enrolled(self):
+        """ Return the number of players enrolled. """
+        if not self.is_loaded:
+            return self._header['nb_enrolled']
+        return len(self.players)
+
+    @property
+    def nb_played_rounds(self):
+        """ Return the number of rounds generated so far. """
+        if not self.is_loaded:
+            return self._header['nb_played_rounds']
+        return len(self.rounds)
+
+    @property
+    def max_players(self):
+        """ Return the number of players expected in the tournament,
+            two per round unless set explicitly.
+        """
+        return self.nb_players or self.nb_rounds * 2
+
     @property
     def is_ready(self):
         """ Return a boolean that indicate wether all players have joined
             the tournament.
         """
-        if len(self.players) == self.nb_rounds * 2:
+        if self.nb_enrolled == self.max_players:
             return True
         return False
 
@@ -131,6 +375,8 @@ class Tournament(BaseModel):
         """ Return a boolean that indicate if all rounds has been settled for
             this tournament.
         """
+        if not self.is_loaded:
+            return self._header['status'] == 'finished'
         if (
             len(self.rounds) == self.nb_rounds and
             all(round.is_finished for round in self.rounds)
@@ -162,74 +408,496 @@ class Tournament(BaseModel):
         return None
 
     def get_sorted_players(self):
-        """ return a list of players sorted by total score and by rank. """
-        return sorted(
-            [player for player in self.players],
-            key=lambda x: (self.total_score(x), - Player.get(x).rank),
-            reverse=True
-        )
+        """ return a list of players sorted by total score, by the TIEBREAKS
+            and finally by rank. The standings are cached until a result
+            changes.
+        """
+        if self.__dict__.get('_standings') is None:
+            ranks = {player.id: player.rank for player in Player.get_many(self.players)}
+            tiebreaks = self.tiebreaks
+            self._standings = sorted(
+                self.players,
+                key=lambda x: (tiebreaks.key(x, TIEBREAKS), - ranks[x]),
+                reverse=True
+            )
+        return list(self._standings)
 
     def generate_next_round(self):
         """ Generate a new round and match players together. """
         players = self.get_sorted_players()
         if not self.rounds:
             self.start_date = datetime.now()
-            match_list = [
-                Match(players[i], players[i + self.nb_rounds])
-                for i in range(self.nb_rounds)
-            ]
         else:
             self.rounds[-1].end_date = datetime.now()
-            match_list = [
-                Match(players[i * 2], players[i * 2 + 1])
-                for i in range(self.nb_rounds)
-            ]
+        opponents, colours, byes = self.pairing_history()
+        tiebreaks = self.tiebreaks
+        pairs, bye = SwissPairing(players, tiebreaks.scores, opponents, colours, byes).pair()
+        match_list = [Match(white, black) for white, black in pairs]
+        round_index = len(self.rounds)
         self.rounds.append(
-            Round(index=len(self.rounds) + 1, start_date=datetime.now(), matchs=match_list)
+            Round(index=round_index + 1, start_date=datetime.now(), matchs=match_list, bye=bye)
         )
+        for white, black in pairs:
+            tiebreaks.add_game(round_index, white, black)
+        if bye is not None:
+            tiebreaks.add_bye(round_index, bye, BYE_SCORE)
+        self._standings = None
         self.save()
 
+    def pairing_history(self):
+        """ Return the previous opponents, colours and byes of each player
+            as expected by SwissPairing.
+        """
+        opponents = {player: set() for player in self.players}
+        colours = {player: [] for player in self.players}
+        byes = set()
+        for round in self.rounds:
+            for match in round.matchs:
+                opponents[match.player_1].add(match.player_2)
+                opponents[match.player_2].add(match.player_1)
+                colours[match.player_1].append('w')
+                colours[match.player_2].append('b')
+            if round.bye is not None:
+                byes.add(round.bye)
+        return opponents, colours, byes
+
+    def is_enrolled(self, player):
+        """ Return True if the player takes part in the tournament. """
+        if isinstance(player, Player):
+            player = player.id
+        if self.__dict__.get('_enrolled') is None:
+            self._enrolled = set(self.players)
+        return player in self._enrolled
+
     def enroll_player(self, player):
         """ Add a new player to tournament."""
         if isinstance(player, Player):
             player = player.id
         if (
-            player not in self.players and
+            not self.is_enrolled(player) and
             not self.is_ready
         ):
             self.players.append(player)
+            self._enrolled.add(player)
+            if self.__dict__.get('_tiebreaks') is not None:
+                self._tiebreaks.add_player(player)
+            self._standings = None
             self.save()
 
+    def settle(self, match, winner=None):
+        """ Set the result of a match and update the score table. The
+            result is only persisted by the next save().
+        """
+        tiebreaks = self.tiebreaks
+        position = self._locate(match)
+        match.set_score(winner)
+        tiebreaks.set_result(
+            position[0], match.player_1, match.player_2, match.score_player_1, match.score_player_2
+        )
+        self._standings = None
+        self.__dict__.setdefault('_settled', set()).add(position)
+
+    def set_score(self, match, winner=None):
+        """ Settle a match of the tournament and append the result to the
+            journal instead of rewriting the whole tournament.
+        """
+        self.settle(match, winner)
+        position = self._locate(match)
+        journal.append(self.id, *position, match.score_player_1, match.score_player_2)
+        self._journaled += 1
+        # The journal now orders this result with those of other processes.
+        self._settled.discard(position)
+        self._save_header()
+        if len(journal) >= JOURNAL_COMPACT_THRESHOLD:
+            self.compact_journal()
+
+    def set_scores(self, results):
+        """ Settle several matchs given as (match, winner) pairs, winner
+            being None for a draw, and save them in a single write. Every
+            result is checked before any is applied: a match outside the
+            tournament or a winner not playing it raises ValueError and
+            changes nothing. If the tournament could not be written, the
+            previous results are restored; once it is written, they are
+            kept even if a later step of the save fails.
+        """
+        results = list(results)
+        previous = {}
+        for match, winner in results:
+            if isinstance(winner, Player):
+                winner = winner.id
+            if winner not in (None, match.player_1, match.player_2):
+                raise ValueError(f"Player {winner} does not play the match {match.player_1} VS {match.player_2}")
+            previous.setdefault(self._locate(match), (match.score_player_1, match.score_player_2))
+        settled = set(self.__dict__.get('_settled', ()))
+        for match, winner in results:
+            self.settle(match, winner)
+        version = self._version
+        try:
+            self.save()
+        except Exception:
+            if self._version == version:
+                self._apply_results(previous)
+                self._settled = settled
+            raise
+        return self
+
+    def set_moves(self, match, moves):
+        """ Record the moves of a match, see set_games. """
+        return self.set_games([(match, moves)])
+
+    def set_games(self, games):
+        """ Record the moves of matchs given as (match, moves) pairs, moves
+            being in coordinate notation. Every game is checked first: an
+            illegal move raises ValueError and stores nothing. The moves go
+            to the move archive and the tournament is saved once with a
+            reference to them.
+        """
+        self._check_modifiable()
+        games = [(self._locate(match), list(moves)) for match, moves in games]
+        for _, moves in games:
+            replay(moves)
+        ids = move_archive.append_many([moves for _, moves in games])
+        with base.storage.lock:
+            # Keep the changes saved by other processes meanwhile.
+            self.refresh()
+            for ((round_index, match_index), _), id in zip(games, ids):
+                self.rounds[round_index].matchs[match_index].game = id
+            self.save()
+        return self
+
+    def _locate(self, match):
+        """ Return the (round index, match index) position of a match. """
+        for round_index in range(len(self.rounds) - 1, -1, -1):
+            for match_index, other in enumerate(self.rounds[round_index].matchs):
+                if other is match:
+                    return round_index, match_index
+        raise ValueError(f"{match!r} is not part of tournament {self.name}")
+
+    def _apply_results(self, results):
+        """ Set match results given as {(round index, match index): (score
+            of player 1, score of player 2)}, keeping the score table
+            up to date.
+        """
+        tiebreaks = self.tiebreaks
+        for (round_index, match_index), (score_player_1, score_player_2) in results.items():
+            try:
+                match = self.rounds[round_index].matchs[match_index]
+            except IndexError:
+                continue
+            match.score_player_1, match.score_player_2 = score_player_1, score_player_2
+            tiebreaks.set_result(round_index, match.player_1, match.player_2, score_player_1, score_player_2)
+        self._standings = None
+
+    def _local_results(self):
+        """ Return the results settled by this instance and not saved yet. """
+        results = {}
+        for round_index, match_index in self.__dict__.get('_settled', ()):
+            match = self.rounds[round_index].matchs[match_index]
+            results[round_index, match_index] = (match.score_player_1, match.score_player_2)
+        return results
+
+    def _pairings(self):
+        """ Return the players and pairings of the tournament, which two
+            versions must share to be merged.
+        """
+        return self.players, [
+            (round.bye, [(match.player_1, match.player_2) for match in round.matchs])
+            for round in self.rounds
+        ]
+
+    def _adopt(self, other):
+        """ Take the state of another instance of the same tournament. """
+        for name in ('_tiebreaks', '_standings', '_enrolled', '_settled'):
+            self.__dict__.pop(name, None)
+        self.__dict__.update(other.__dict__)
+
+    def merge(self, data):
+        """ Rebase the tournament on the document saved by another process
+            and its journal, keeping the results settled here. Raise
+            StaleObjectError if players or pairings changed on either side,
+            or ValueError if it has been archived.
+        """
+        current = type(self)._build(self.id, data)
+        current._check_modifiable()
+        if self._pairings() != current._pairings():
+            raise StaleObjectError(f"{self.name} was paired or enrolled by another process")
+        local = self._local_results()
+        self._adopt(current)
+        self._apply_results(local)
+        self._settled = set(local)
+
+    def _reload(self, data):
+        if self.__dict__.get('_settled'):
+            self.merge(data)
+        else:
+            self._adopt(type(self)._build(self.id, data))
+
+    def refresh(self):
+        """ Reload the tournament if another process saved it or journaled
+            results of it since it was loaded, keeping its caches otherwise.
+            A header-only tournament is always up to date.
+        """
+        if self.is_loaded:
+            data = base.storage.get(self._table(), self.id)
+            if data is not None and (
+                data.get(VERSION_FIELD, 0) != self._version or len(journal.events(self.id)) != self._journaled
+            ):
+                self._reload(data)
+        return self
+
+    def _document(self):
+        return {**self.dict, JOURNAL_FIELD: self._folded}
+
+    def save(self):
+        """ Save the full tournament, which makes its journal events
+            redundant. Results journaled by other processes are applied
+            first so that the snapshot does not drop them.
+            The game history, the journal and the header are updated once
+            the tournament is written. Each of these steps is repeated by
+            the next save if it fails, and the snapshot records the last
+            event it includes so that events left in the journal are not
+            replayed over it meanwhile.
+        """
+        self._check_modifiable()
+        with base.storage.lock:
+            local = self._local_results()
+            events = journal.events(self.id, after=self._folded)
+            self._apply_results({
+                (event['round'], event['match']): (event['score_player_1'], event['score_player_2'])
+                for event in events
+            })
+            self._apply_results(local)
+            if events:
+                self._folded = events[-1].get('id')
+            super().save()
+            self.__dict__.pop('_settled', None)
+            history.record([self])
+            journal.discard(self.id)
+            self._journaled = 0
+            self._save_header()
+        return self
+
+    def _check_modifiable(self):
+        """ Raise ValueError if the tournament is archived. """
+        if self.is_archived:
+            raise ValueError(f"{self.name} is archived and can no longer be modified")
+
+    @property
+    def status(self):
+        """ Return the lifecycle status of the tournament: 'unready',
+            'unfinished' or 'finished'.
+        """
+        if not self.is_ready:
+            return 'unready'
+        elif not self.is_finished:
+            return 'unfinished'
+        return 'finished'
+
+    @property
+    def header(self):
+        """ Return the fields of the tournament needed to list it without
+            loading its players and rounds.
+        """
+        if not self.is_loaded:
+            return self._header
+        return {
+            'name': self.name,
+            'nb_rounds': self.nb_rounds,
+            'nb_players': self.nb_players,
+            'nb_enrolled': self.nb_enrolled,
+            'nb_played_rounds': self.nb_played_rounds,
+            'status': self.status,
+        }
+
+    def _save_header(self):
+        """ Record the tournament header in the header table if it changed. """
+        header = self.header
+        if '_header' not in self.__dict__:
+            # Loaded tournaments read their stored header only when saved.
+            self._header = base.storage.get(self.HEADER_TABLE, self.id)
+        if self._header != header:
+            base.storage.update(self.HEADER_TABLE, self.id, header)
+            self._header = header
+
+    @classmethod
+    def _build(cls, id, data):
+        """ Deserialize the last snapshot and replay its pending results,
+            or read the tournament from its archive.
+        """
+        if ARCHIVE_FIELD in data:
+            return cls._build_archived(id, data)
+        instance = super()._build(id, data)
+        events = journal.events(id)
+        for event in events_after(events, data.get(JOURNAL_FIELD)):
+            try:
+                match = instance.rounds[event['round']].matchs[event['match']]
+            except IndexError:
+                continue
+            match.score_player_1 = event['score_player_1']
+            match.score_player_2 = event['score_player_2']
+        instance._journaled = len(events)
+        instance._folded = events[-1].get('id') if events else None
+        return instance
+
+    @classmethod
+    def _build_archived(cls, id, stub):
+        """ Deserialize a tournament from the archive named by its stub. """
+        season = stub[ARCHIVE_FIELD]
+        instance = super()._build(id, archive.get(season, id))
+        instance._version = stub.get(VERSION_FIELD, 0)
+        instance._header = instance.header
+        instance._archive = season
+        return instance
+
+    @property
+    def is_archived(self):
+        """ Return True if the tournament was moved to the archives. """
+        return self.__dict__.get('_archive') is not None
+
+    @property
+    def season(self):
+        """ Return the season of the tournament: the year it started. """
+        if self.is_archived:
+            return self._archive
+        return str(self.start_date.year) if self.start_date else 'undated'
+
+    @classmethod
+    def archive_finished(cls):
+        """ Move the finished tournaments to the archive of their season,
+            leaving in the database a stub which keeps their id taken and
+            tells where to read them. Return the archived tournaments.
+        """
+        with base.storage.lock:
+            ids = [id for id, status in cls.status_index().items() if status == 'finished']
+            # Built from the stored documents and the journal, as cached
+            # instances may be stale or header-only.
+            tournaments = [
+                cls._build(id, data) for id, data in sorted(base.storage.get_many(cls._table(), ids).items())
+                if ARCHIVE_FIELD not in data
+            ]
+            tournaments = [tournament for tournament in tournaments if tournament.is_finished]
+            seasons = defaultdict(dict)
+            for tournament in tournaments:
+                document = {**tournament.dict, VERSION_FIELD: tournament._version}
+                seasons[tournament.season][tournament.id] = (document, tournament.header)
+            for season, documents in seasons.items():
+                archive.store(season, documents)
+            # Results still in the journal are part of the archived copy.
+            history.record(tournaments)
+            base.storage.update_many(cls._table(), {
+                tournament.id: {ARCHIVE_FIELD: tournament.season, VERSION_FIELD: tournament._version + 1}
+                for tournament in tournaments
+            })
+            base.storage.update_many(cls.HEADER_TABLE, {
+                tournament.id: {ARCHIVE_FIELD: tournament.season} for tournament in tournaments
+            })
+            for tournament in tournaments:
+                journal.discard(tournament.id)
+                base.identity_map.discard(cls, tournament.id)
+        return tournaments
+
+    @staticmethod
+    def archive_exists():
+        """ Return True if at least one tournament has been archived. """
+        return archive.exists()
+
+    @staticmethod
+    def archive_index():
+        """ Return {id: {'season': season, **header}} for every archived
+            tournament.
+        """
+        return archive.index()
+
+    @classmethod
+    def archived(cls, season=None):
+        """ Return the archived tournaments, of a single season if given. """
+        return cls.get_many(
+            id for id, entry in sorted(archive.index().items()) if season in (None, entry['season'])
+        )
+
+    @classmethod
+    def compact_journal(cls):
+        """ Snapshot every tournament having pending journal events. """
+        for tournament in cls.get_many(journal.tournaments()):
+            tournament.save()
+
+    @property
+    def tiebreaks(self):
+        """ Return the TiebreakIndex of the tournament, built in one pass
+            over the matchs then kept up to date as results are settled.
+        """
+        if self.__dict__.get('_tiebreaks') is None:
+            self._tiebreaks = TiebreakIndex.build(self.players, self.rounds, BYE_SCORE)
+        return self._tiebreaks
+
+    @property
+    def scores(self):
+        """ Return a {player id: score} table. """
+        return self.tiebreaks.scores
+
     def total_score(self, player):
         """ Return the cumulated score of a given player troughout the
             tournament.
         """
-        return sum(
-            match.get_score(player)
-            for round in self.rounds
-            for match in round.matchs
-        )
+        if isinstance(player, Player):
+            player = player.id
+        return self.scores.get(player, 0)
 
     @classmethod
-    def get_ready(cls):
-        """ Return a list of all tournament which are not ready. """
+    def header_index(cls):
+        """ Return a {tournament id: header} dict read from the header table,
+            indexing first the tournaments missing from it. Archived
+            tournaments are left out.
+        """
+        headers = base.storage.all(cls.HEADER_TABLE)
+        index = {id: header for id, header in headers if ARCHIVE_FIELD not in header}
+        missing = set(base.storage.ids(cls._table())) - {id for id, _ in headers}
+        for tournament in cls.get_many(missing):
+            tournament._save_header()
+            index[tournament.id] = tournament.header
+        return index
+
+    @classmethod
+    def status_index(cls):
+        """ Return a {tournament id: status} dict without loading any
+            tournament.
+        """
+        return {id: header['status'] for id, header in cls.header_index().items()}
+
+    @classmethod
+    def all(cls):
+        """ Return every tournament as a lightweight header, players and
+            rounds are loaded on first access.
+        """
+        return [cls._from_header(id, header) for id, header in sorted(cls.header_index().items())]
+
+    @classmethod
+    def get_by_status(cls, *statuses):
+        """ Return the tournaments having one of the given statuses, as
+            recorded in their stored header, so that a tournament changed
+            by another terminal is listed where it now belongs.
+        """
         return [
-            tournament for tournament in cls.all()
-            if tournament.is_ready
+            cls._from_header(id, header)
+            for id, header in sorted(cls.header_index().items()) if header['status'] in statuses
         ]
 
+    @classmethod
+    def get_ready(cls):
+        """ Return a list of all tournament which are ready. """
+        return cls.get_by_status('unfinished', 'finished')
+
     @classmethod
     def get_unready(cls):
         """ Return a list of all tournament which are not ready. """
-        return [
-            tournament for tournament in cls.all()
-            if not tournament.is_ready
-        ]
+        return cls.get_by_status('unready')
 
     @classmethod
     def get_unfinished(cls):
         """ Return a list of all tournament which are not finished. """
-        return [
-            tournament for tournament in cls.all()
-            if not tournament.is_finished and tournament.is_ready
-        ]
+        return cls.get_by_status('unfinished')
+
+
+# The dataclass default would be found before __getattr__ and hide the
+# start date of header-only tournaments.
+del Tournament.start_date
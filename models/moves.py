@@ -0,0 +1,143 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from settings import DATABASE_NAME, MOVES_SUFFIX
+from .board import PROMOTIONS, parse_move, move_name
+from .locking import FileLock
+
+
+def encode_move(text):
+    """ Pack a move in coordinate notation into 15 bits: the from and to
+        squares on 6 bits each, then the promotion (0 for none, then
+        knight, bishop, rook, queen).
+    """
+    origin, target, promotion = parse_move(text)
+    return origin | target << 6 | (PROMOTIONS.index(promotion) + 1 if promotion else 0) << 12
+
+
+def decode_move(code):
+    promotion = code >> 12
+    return move_name((code & 63, code >> 6 & 63, PROMOTIONS[promotion - 1] if promotion else ''))
+
+
+def pack_moves(moves):
+    """ Return the moves of a game as little endian 16 bit codes. """
+    codes = array('H', map(encode_move, moves))
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def unpack_moves(data):
+    codes = array('H')
+    codes.frombytes(data)
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return [decode_move(code) for code in codes]
+
+
+class MoveArchive:
+    """ Append-only store of the moves of games, two bytes per move.
+        Games are appended to a data file and located by an index file of
+        fixed size (offset, number of moves) entries, the id of a game
+        being its position in the index. Both files are memory mapped, so
+        reading a game touches only its own bytes. The index entry is
+        written after the moves: a game is never seen partially written,
+        and an interrupted append only leaves unreferenced bytes.
+    """
+
+    ENTRY = struct.Struct('<QI')
+
+    def __init__(self, path):
+        self.open(path)
+
+    def open(self, path):
+        """ Use the archive stored at path.bin and path.idx. """
+        self.close()
+        self.data_path = f'{path}.bin'
+        self.index_path = f'{path}.idx'
+        self.lock = FileLock(self.data_path)
+
+    def close(self):
+        for name in ('_data', '_index'):
+            mapping = self.__dict__.pop(name, None)
+            if mapping is not None:
+                mapping.close()
+
+    def _map(self, name, path, size):
+        """ Return the mapping of a file, mapped again if it is smaller
+            than size since it has grown.
+        """
+        mapping = self.__dict__.get(name)
+        if mapping is None or len(mapping) < size:
+            try:
+                with open(path, 'rb') as file:
+                    if os.fstat(file.fileno()).st_size >= max(size, 1):
+                        if mapping is not None:
+                            mapping.close()
+                        mapping = self.__dict__[name] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except FileNotFoundError:
+                pass
+        return mapping if mapping is not None and len(mapping) >= size else None
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.index_path) // self.ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, id):
+        """ Return the packed moves of a game. """
+        start = id * self.ENTRY.size
+        index = self._map('_index', self.index_path, start + self.ENTRY.size) if id >= 0 else None
+        if index is None:
+            raise LookupError(f"Game {id} is missing from the move archive")
+        offset, nb_moves = self.ENTRY.unpack_from(index, start)
+        data = self._map('_data', self.data_path, offset + 2 * nb_moves)
+        if data is None:
+            raise LookupError(f"Moves of game {id} are missing from the move archive")
+        return data[offset:offset + 2 * nb_moves]
+
+    def get(self, id):
+        """ Return the moves of a game in coordinate notation. """
+        return unpack_moves(self.read(id))
+
+    def append(self, moves):
+        """ Store the moves of a game and return its id. """
+        return self.append_many([moves])[0]
+
+    def append_many(self, games):
+        """ Store the moves of several games in a single write of each
+            file and return their ids.
+        """
+        packed = [pack_moves(moves) for moves in games]
+        with self.lock:
+            with open(self.data_path, 'ab') as data, open(self.index_path, 'ab') as index:
+                offset = data.seek(0, os.SEEK_END)
+                # Drop the end of an entry left by an interrupted append.
+                first = index.seek(0, os.SEEK_END) // self.ENTRY.size
+                index.truncate(first * self.ENTRY.size)
+                entries = []
+                for moves in packed:
+                    entries.append(self.ENTRY.pack(offset, len(moves) // 2))
+                    offset += len(moves)
+                data.write(b''.join(packed))
+                data.flush()
+                os.fsync(data.fileno())
+                index.write(b''.join(entries))
+                index.flush()
+                os.fsync(index.fileno())
+        return list(range(first, first + len(packed)))
+
+
+def moves_path(database_path):
+    """ Return the path, without extension, of the move archive of a
+        database, named after it so that each database of a folder has its
+        own.
+    """
+    return f'{database_path}{MOVES_SUFFIX}'
+
+
+move_archive = MoveArchive(moves_path(DATABASE_NAME))
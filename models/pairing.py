@@ -0,0 +1,327 @@
+from collections import Counter, deque
+
+
+def colour_balance(history):
+    """ Return the number of games played with white minus games played
+        with black, from a list of 'w'/'b' colours.
+    """
+    return history.count('w') - history.count('b')
+
+
+def maximum_matching(players, compatible, pairs=()):
+    """ Return a maximum matching of players, as {player: opponent} for
+        every matched player, two players being adjacent if compatible.
+        Edmonds' blossom algorithm, in O(n^3), starting from the given
+        pairs so that only the pairs on augmenting paths change. The
+        neighbours of a player are only listed when it is reached.
+    """
+    players = list(players)
+    size = len(players)
+    position = {player: vertex for vertex, player in enumerate(players)}
+    neighbours = [None] * size
+
+    def graph(vertex):
+        if neighbours[vertex] is None:
+            neighbours[vertex] = [
+                other for other in range(size) if other != vertex and compatible(players[vertex], players[other])
+            ]
+        return neighbours[vertex]
+
+    mate = [-1] * size
+    for player_1, player_2 in pairs:
+        mate[position[player_1]], mate[position[player_2]] = position[player_2], position[player_1]
+    # Pair greedily the players left, before augmenting.
+    for vertex in range(size):
+        if mate[vertex] == -1:
+            for other in graph(vertex):
+                if mate[other] == -1:
+                    mate[vertex], mate[other] = other, vertex
+                    break
+
+    def common_base(base, parent, vertex, other):
+        seen = set()
+        while True:
+            vertex = base[vertex]
+            seen.add(vertex)
+            if mate[vertex] == -1:
+                break
+            vertex = parent[mate[vertex]]
+        while True:
+            other = base[other]
+            if other in seen:
+                return other
+            other = parent[mate[other]]
+
+    def mark_path(base, parent, blossom, vertex, stop, child):
+        while base[vertex] != stop:
+            blossom[base[vertex]] = blossom[base[mate[vertex]]] = True
+            parent[vertex] = child
+            child = mate[vertex]
+            vertex = parent[mate[vertex]]
+
+    def augmenting_path(root):
+        """ Return the end of an augmenting path from root and the parents
+            along it, or None.
+        """
+        used, parent, base = [False] * size, [-1] * size, list(range(size))
+        used[root] = True
+        queue = deque([root])
+        while queue:
+            vertex = queue.popleft()
+            for other in graph(vertex):
+                if base[vertex] == base[other] or mate[vertex] == other:
+                    continue
+                if other == root or (mate[other] != -1 and parent[mate[other]] != -1):
+                    # Odd cycle: contract the blossom into its base.
+                    current = common_base(base, parent, vertex, other)
+                    blossom = [False] * size
+                    mark_path(base, parent, blossom, vertex, current, other)
+                    mark_path(base, parent, blossom, other, current, vertex)
+                    for index in range(size):
+                        if blossom[base[index]]:
+                            base[index] = current
+                            if not used[index]:
+                                used[index] = True
+                                queue.append(index)
+                elif parent[other] == -1:
+                    parent[other] = vertex
+                    if mate[other] == -1:
+                        return other, parent
+                    used[mate[other]] = True
+                    queue.append(mate[other])
+        return None
+
+    for root in range(size):
+        if mate[root] != -1:
+            continue
+        found = augmenting_path(root)
+        if found is None:
+            continue
+        vertex, parent = found
+        while vertex != -1:
+            previous = mate[parent[vertex]]
+            mate[vertex], mate[parent[vertex]] = parent[vertex], vertex
+            vertex = previous
+    return {players[vertex]: players[mate[vertex]] for vertex in range(size) if mate[vertex] != -1}
+
+
+class SwissPairing:
+    """ Swiss system pairing of a single round.
+
+        standings: player ids ordered from first to last place.
+        scores: {player id: score}.
+        opponents: {player id: set of previous opponents}.
+        colours: {player id: list of colours played, 'w' or 'b'}.
+        byes: set of player ids who already received a bye.
+
+        Players are paired inside their score group, top half against
+        bottom half, a player left alone floating down to the next group.
+        The pairing is searched with backtracking, then completed by a
+        maximum matching if the search runs out of its budget, so that a
+        colour imbalance of three is only accepted when no pairing of the
+        round avoids it, and a rematch only when no pairing avoids it
+        whoever gets the bye.
+    """
+
+    # Opponents tried by the search, per player, before the best pairing
+    # found is completed by a maximum matching.
+    SEARCH_BUDGET = 20
+
+    def __init__(self, standings, scores, opponents=None, colours=None, byes=None, balances=None):
+        self.standings = list(standings)
+        self.scores = scores
+        self.opponents = opponents or {}
+        self.colours = colours or {}
+        self.byes = byes or set()
+        if balances is None:
+            balances = {player: colour_balance(history) for player, history in self.colours.items()}
+        self.balances = balances
+
+    def _balance(self, player):
+        return self.balances.get(player, 0)
+
+    def is_rematch(self, player_1, player_2):
+        return player_2 in self.opponents.get(player_1, ())
+
+    def is_new(self, player_1, player_2):
+        """ Return True if two players have not met yet. """
+        return player_2 not in self.opponents.get(player_1, ())
+
+    def compatible(self, player_1, player_2):
+        """ Return True if two players may be paired together. """
+        if self.is_rematch(player_1, player_2):
+            return False
+        balance_1, balance_2 = self._balance(player_1), self._balance(player_2)
+        if (balance_1 >= 2 and balance_2 >= 2) or (balance_1 <= -2 and balance_2 <= -2):
+            return False
+        return True
+
+    def colours_for(self, player_1, player_2):
+        """ Return the pair as (white, black), giving white to the player
+            who had it the least. player_1 is the higher placed one.
+        """
+        balance_1, balance_2 = self.balances.get(player_1, 0), self.balances.get(player_2, 0)
+        if balance_1 < balance_2:
+            return player_1, player_2
+        if balance_2 < balance_1:
+            return player_2, player_1
+        last_colour = self.colours.get(player_1) or ['b']
+        if last_colour[-1] == 'b':
+            return player_1, player_2
+        return player_2, player_1
+
+    def bye_candidates(self):
+        """ Return the players who may get the bye, the lowest placed first:
+            those without a previous bye, or everyone if all had one.
+        """
+        candidates = [player for player in reversed(self.standings) if player not in self.byes]
+        return candidates or self.standings[::-1]
+
+    def select_bye(self):
+        """ Return the lowest placed player without a previous bye. """
+        return self.bye_candidates()[0]
+
+    def _candidates(self, remaining, counts):
+        """ Yield the positions in remaining of the opponents of its first
+            player, in order of preference: the player at the same place in
+            the bottom half of its score group, the following then the
+            previous ones, then the players of the lower groups.
+        """
+        group = counts[self.scores.get(remaining[0], 0)]
+        half = group // 2
+        if half:
+            yield from range(half, group)
+            yield from range(half - 1, 0, -1)
+        yield from range(max(group, 1), len(remaining))
+
+    def _search(self, players, limits):
+        """ Return (pairs, complete): the pairs of players who have not met
+            yet found in order of preference, with complete True if they
+            cover every player, False if the search proved that no pairing
+            does, or None if it ran out of its budget. Unless complete,
+            pairs are the most found. limits maps the players who can only
+            meet players outside of their group to this group, 0 or 1: no
+            more than half of the players left may belong to a group.
+        """
+        score_of, opponents_of, limit_of = self.scores.get, self.opponents.get, limits.get
+        remaining = list(players)
+        counts = Counter([score_of(player, 0) for player in remaining])
+        limited = [0, 0]
+        for player in remaining:
+            if player in limits:
+                limited[limits[player]] += 1
+        if 2 * max(limited) > len(remaining):
+            return [], False
+        # Each choice is undone by restoring remaining, which stays in
+        # standings order, so the pending candidates remain valid.
+        choices, best, candidates = [], [], None
+        budget = self.SEARCH_BUDGET * len(remaining)
+        while remaining:
+            if candidates is None:
+                # The first candidates of the players of a score group are
+                # its bottom half in order: take them at once while allowed.
+                # Such choices keep no candidates, found again if undone.
+                score = score_of(remaining[0], 0)
+                half, size, paired = counts[score] // 2, len(remaining), 0
+                while paired < half:
+                    player, opponent = remaining[paired], remaining[half + paired]
+                    group_1, group_2 = limit_of(player), limit_of(opponent)
+                    if opponent in opponents_of(player, ()) or (group_1 is not None and group_1 == group_2):
+                        break
+                    low = limited[0] - (group_1 == 0) - (group_2 == 0)
+                    high = limited[1] - (group_1 == 1) - (group_2 == 1)
+                    if 2 * (low if low > high else high) > size - 2 * paired - 2:
+                        break
+                    choices.append((None, half - paired, player, opponent, limited))
+                    limited = [low, high]
+                    paired += 1
+                if paired:
+                    del remaining[half:half + paired]
+                    del remaining[:paired]
+                    counts[score] -= 2 * paired
+                    budget -= paired
+                    if not remaining:
+                        break
+                candidates = self._candidates(remaining, counts)
+                if paired < half:
+                    # Its first candidate was just refused.
+                    next(candidates)
+            player = remaining[0]
+            met, group_1 = opponents_of(player, ()), limit_of(player)
+            for index in candidates:
+                budget -= 1
+                opponent = remaining[index]
+                group_2 = limit_of(opponent)
+                if opponent in met or (group_1 is not None and group_1 == group_2):
+                    continue
+                low = limited[0] - (group_1 == 0) - (group_2 == 0)
+                high = limited[1] - (group_1 == 1) - (group_2 == 1)
+                if 2 * (low if low > high else high) > len(remaining) - 2:
+                    continue
+                choices.append((candidates, index, player, opponent, limited))
+                limited = [low, high]
+                del remaining[index]
+                del remaining[0]
+                counts[score_of(player, 0)] -= 1
+                counts[score_of(opponent, 0)] -= 1
+                candidates = None
+                break
+            else:
+                if len(choices) > len(best):
+                    best = [choice[2:4] for choice in choices]
+                if not choices:
+                    return best, False
+                if budget < 0:
+                    return best, None
+                candidates, index, player, opponent, limited = choices.pop()
+                remaining.insert(0, player)
+                remaining.insert(index, opponent)
+                counts[score_of(player, 0)] += 1
+                counts[score_of(opponent, 0)] += 1
+                if candidates is None:
+                    candidates = self._candidates(remaining, counts)
+                    next(candidates)
+        return [choice[2:4] for choice in choices], True
+
+    def _pair_all(self, players, limits, maximum=False):
+        """ Return the pairs of players searched in order of preference if
+            they cover them all. Otherwise return a maximum matching,
+            completing by augmenting paths the best pairs found, unless
+            maximum is False and the search proved that no pairing covers
+            every player. Players in limits also respect colours.
+        """
+        pairs, complete = self._search(players, limits)
+        if complete or (complete is False and not maximum):
+            return pairs
+        mates = maximum_matching(players, self.compatible if limits else self.is_new, pairs)
+        rank = {player: index for index, player in enumerate(players)}
+        return [(player, mates[player]) for player in players if rank[player] < rank.get(mates.get(player), -1)]
+
+    def pair(self):
+        """ Return (list of (white, black) pairs, bye player or None). """
+        byes = self.bye_candidates() if len(self.standings) % 2 else [None]
+        bye = byes[0]
+        players = [player for player in self.standings if player != bye]
+        # Players who must not get the same colour again can only meet the
+        # others.
+        limits = {player: int(balance > 0) for player, balance in self.balances.items() if abs(balance) >= 2}
+        pairs = self._pair_all(players, limits)
+        if len(pairs) * 2 < len(players):
+            # Colour constraints are dropped before rematches are allowed,
+            # the bye going to another player if that avoids them.
+            for bye in byes:
+                players = [player for player in self.standings if player != bye]
+                pairs = self._pair_all(players, {})
+                if len(pairs) * 2 == len(players):
+                    break
+            else:
+                # Rematches cannot be avoided: keep as many new games as
+                # possible.
+                bye = byes[0]
+                players = [player for player in self.standings if player != bye]
+                pairs = self._pair_all(players, {}, maximum=True)
+                paired = {player for pair in pairs for player in pair}
+                unpaired = [player for player in players if player not in paired]
+                pairs.extend(zip(unpaired[::2], unpaired[1::2]))
+        colours_for = self.colours_for
+        return [colours_for(player_1, player_2) for player_1, player_2 in pairs], bye
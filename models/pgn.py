@@ -0,0 +1,113 @@
+import re
+from .board import Position, move_name, parse_move
+
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$')
+# Comments, variations, annotations and move or move number tokens.
+TOKEN_PATTERN = re.compile(r'\{[^}]*\}?|;[^\n]*|\$\d+|[()]|[^\s(){};]+')
+MOVE_NUMBER = re.compile(r'^\d+\.+')
+# Scores of white and black for each result, '*' being an unknown result.
+SCORES = {'1-0': (1, 0), '0-1': (0, 1), '1/2-1/2': (0.5, 0.5)}
+RESULTS = (*SCORES, '*')
+# Tags written first, in this order, by the PGN standard.
+ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+
+def read_games(lines):
+    """ Yield the (tags, movetext) of each game of a PGN file read line by
+        line, so that only one game is held in memory at a time.
+    """
+    tags, movetext = {}, []
+    for line in lines:
+        line = line.strip()
+        if line.startswith('%'):
+            continue
+        if line.startswith('[') and TAG_PATTERN.match(line):
+            if movetext:
+                yield tags, '\n'.join(movetext)
+                tags, movetext = {}, []
+            name, value = TAG_PATTERN.match(line).groups()
+            tags[name] = re.sub(r'\\(.)', r'\1', value)
+        elif line:
+            movetext.append(line)
+    if tags or movetext:
+        yield tags, '\n'.join(movetext)
+
+
+def parse_movetext(movetext):
+    """ Return the SAN moves of the main line of a movetext and its result,
+        or None if it has none.
+    """
+    sans, result, depth = [], None, 0
+    for token in TOKEN_PATTERN.findall(movetext):
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(depth - 1, 0)
+        elif depth or token[0] in '{;$':
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            token = MOVE_NUMBER.sub('', token)
+            if token and not token.isdigit():
+                sans.append(token)
+    return sans, result
+
+
+def from_san(sans):
+    """ Return SAN moves from the starting position in coordinate notation,
+        raising ValueError at the first illegal one.
+    """
+    position, moves = Position.initial(), []
+    for ply, san in enumerate(sans):
+        try:
+            move = position.parse_san(san)
+        except ValueError as error:
+            raise ValueError(f"move {ply // 2 + 1}{'.' if ply % 2 == 0 else '...'} {error}")
+        moves.append(move_name(move))
+        position = position.push(move)
+    return moves
+
+
+def to_san(moves):
+    """ Return legal moves, in coordinate notation, in SAN. """
+    position, sans = Position.initial(), []
+    for text in moves:
+        move = parse_move(text)
+        sans.append(position.san(move))
+        position = position.push(move)
+    return sans
+
+
+def format_movetext(sans, result=None, width=None):
+    """ Return numbered SAN moves followed by the result, if any, in lines
+        of at most width characters, a move staying with its number.
+    """
+    tokens = [f'{ply // 2 + 1}. {san}' if ply % 2 == 0 else san for ply, san in enumerate(sans)]
+    if result is not None:
+        tokens.append(result)
+    if width is None:
+        return ' '.join(tokens)
+    lines = ['']
+    for token in tokens:
+        if lines[-1] and len(lines[-1]) + 1 + len(token) > width:
+            lines.append('')
+        lines[-1] = f'{lines[-1]} {token}' if lines[-1] else token
+    return '\n'.join(lines)
+
+
+def match_result(match):
+    """ Return the result of a match, player_1 having white. """
+    for result, scores in SCORES.items():
+        if (match.score_player_1, match.score_player_2) == scores:
+            return result
+    return '*'
+
+
+def write_game(file, tags, moves, result='*'):
+    """ Write a game given its tags and its moves in coordinate notation. """
+    tags = {**{name: '?' for name in ROSTER}, **tags, 'Result': result}
+    for name in (*ROSTER, *(name for name in tags if name not in ROSTER)):
+        value = str(tags[name]).replace('\\', '\\\\').replace('"', '\\"')
+        file.write(f'[{name} "{value}"]\n')
+    file.write(f'\n{format_movetext(to_san(moves), result, 79)}\n\n')
@@ -0,0 +1,143 @@
+from itertools import chain
+from settings import DEFAULT_RATING, K_FACTOR
+
+# numpy is optional and slow to import: it is imported by the first
+# recomputation and stays None if it is not installed.
+numpy = None
+_numpy_imported = False
+
+
+def load_numpy():
+    """ Import numpy on first call and return it, or None if it is not
+        installed.
+    """
+    global numpy, _numpy_imported
+    if not _numpy_imported:
+        _numpy_imported = True
+        try:
+            import numpy as module
+        except ImportError:  # fall back to plain python loops.
+            module = None
+        numpy = module
+    return numpy
+
+
+def expected_score(rating_1, rating_2):
+    """ Return the expected score of a player rated rating_1 against a
+        player rated rating_2.
+    """
+    return 1 / (1 + 10 ** ((rating_2 - rating_1) / 400))
+
+
+def performance_rating(opponent_ratings, score):
+    """ Return the rating for which the expected score against opponents
+        rated opponent_ratings equals score, or None without opponents.
+        It is searched within 800 points of the average rating of the
+        opponents, which caps the performance of perfect or null scores.
+    """
+    if not opponent_ratings:
+        return None
+    average = sum(opponent_ratings) / len(opponent_ratings)
+    low, high = average - 800, average + 800
+    # The expected score grows with the rating: bisect down to 0.01 point.
+    while high - low > 0.01:
+        middle = (low + high) / 2
+        if sum(expected_score(middle, rating) for rating in opponent_ratings) < score:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def collect_games(tournaments):
+    """ Return the finished matchs of tournaments as a list of rating
+        periods, one per round, each holding (player_1, player_2, score of
+        player_1) tuples. Tournaments are taken in chronological order.
+    """
+    periods = []
+    # Timestamps order both naive dates and the utc ones loaded from storage.
+    for tournament in sorted(
+        tournaments, key=lambda x: (x.start_date is None, x.start_date.timestamp() if x.start_date else 0, x.id)
+    ):
+        for round in tournament.rounds:
+            games = [
+                (match.player_1, match.player_2, match.score_player_1)
+                for match in round.matchs if match.is_finished
+            ]
+            if games:
+                periods.append(games)
+    return periods
+
+
+class EloRating:
+    """ Elo rating engine. Ratings are a {player id: rating} dict; players
+        missing from it start at the default rating.
+    """
+
+    def __init__(self, k_factor=K_FACTOR, default=DEFAULT_RATING):
+        self.k_factor = k_factor
+        self.default = default
+
+    def update(self, ratings, player_1, player_2, score):
+        """ Update ratings in place with the result of a single game, score
+            being the score of player_1.
+        """
+        rating_1 = ratings.get(player_1, self.default)
+        rating_2 = ratings.get(player_2, self.default)
+        delta = self.k_factor * (score - expected_score(rating_1, rating_2))
+        ratings[player_1] = rating_1 + delta
+        ratings[player_2] = rating_2 - delta
+        return ratings
+
+    def recompute(self, periods, ratings=None):
+        """ Replay every rating period from the initial ratings and return
+            the final ratings. Games of a period are rated simultaneously,
+            from the ratings at the start of the period.
+        """
+        ratings = dict(ratings or {})
+        if load_numpy() is None:
+            return self._recompute_python(periods, ratings)
+        return self._recompute_numpy(periods, ratings)
+
+    def _recompute_python(self, periods, ratings):
+        for games in periods:
+            deltas = {}
+            for player_1, player_2, score in games:
+                rating_1 = ratings.get(player_1, self.default)
+                rating_2 = ratings.get(player_2, self.default)
+                delta = self.k_factor * (score - expected_score(rating_1, rating_2))
+                deltas[player_1] = deltas.get(player_1, 0) + delta
+                deltas[player_2] = deltas.get(player_2, 0) - delta
+            for player, delta in deltas.items():
+                ratings[player] = ratings.get(player, self.default) + delta
+        return ratings
+
+    def _recompute_numpy(self, periods, ratings):
+        games = numpy.fromiter(
+            chain.from_iterable(chain.from_iterable(periods)), dtype=float
+        ).reshape(-1, 3)
+        known = numpy.fromiter(ratings, dtype=float, count=len(ratings))
+        # Map player ids to dense positions in the ratings array.
+        players, positions = numpy.unique(
+            numpy.concatenate((games[:, :2].ravel(), known)), return_inverse=True
+        )
+        first, second = positions[:2 * len(games)].reshape(-1, 2).T
+        values = numpy.full(len(players), float(self.default))
+        values[positions[2 * len(games):]] = list(ratings.values())
+        scores = games[:, 2]
+        start = 0
+        for size in map(len, periods):
+            stop = start + size
+            period_first, period_second = first[start:stop], second[start:stop]
+            expected = 1 / (1 + 10 ** ((values[period_second] - values[period_first]) / 400))
+            deltas = self.k_factor * (scores[start:stop] - expected)
+            numpy.add.at(values, period_first, deltas)
+            numpy.add.at(values, period_second, -deltas)
+            start = stop
+        return dict(zip(players.astype(int).tolist(), values.tolist()))
+
+
+def ranks_from_ratings(ratings):
+    """ Return a {player id: rank} dict, rank 1 being the highest rating. """
+    ordered = sorted(ratings, key=lambda player: (-ratings[player], player))
+    return {player: rank for rank, player in enumerate(ordered, 1)}
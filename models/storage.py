@@ -0,0 +1,456 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from .locking import FileLock
+
+
+class BaseStorage(ABC):
+    """ Abstract class for document storage backends.
+        Documents are plain dicts identified by an integer id inside a
+        named table. The lock attribute is a FileLock serializing writes
+        between processes, reads never take it.
+    """
+
+    @abstractmethod
+    def tables(self):
+        """ Return the names of all tables holding documents. """
+        pass
+
+    @abstractmethod
+    def get(self, table, id):
+        """ Return the document stored under id or None. """
+        pass
+
+    @abstractmethod
+    def get_many(self, table, ids):
+        """ Return a dict of {id: document} for the ids found in table. """
+        pass
+
+    @abstractmethod
+    def all(self, table):
+        """ Return a list of (id, document) tuples ordered by id. """
+        pass
+
+    @abstractmethod
+    def ids(self, table):
+        """ Return the ids of all documents of a table. """
+        pass
+
+    @abstractmethod
+    def values(self, table, key):
+        """ Return {id: value of key or None} for every document of a
+            table, without loading the documents.
+        """
+        pass
+
+    @abstractmethod
+    def insert(self, table, document):
+        """ Store a new document and return its id. """
+        pass
+
+    @abstractmethod
+    def insert_many(self, table, documents):
+        """ Store several new documents in a single write and return their
+            ids.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, table, id, document):
+        """ Create or replace the document stored under id. """
+        pass
+
+    @abstractmethod
+    def update_many(self, table, documents):
+        """ Create or replace several documents given as {id: document}
+            in a single write.
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class AtomicJSONStorage:
+    """ TinyDB storage reading the json file on every access and replacing
+        it atomically on write, so a reader never sees a partially written
+        file even while another process is saving.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        try:
+            with open(self.path) as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        return json.loads(content) if content else None
+
+    def write(self, data):
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as file:
+            # dumps uses the C encoder, dump the much slower python one.
+            file.write(json.dumps(data))
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        pass
+
+
+class TinyDBStorage(BaseStorage):
+    """ Storage backend keeping every table in a single TinyDB json file.
+        Writes read the file again under the lock, so they apply on top of
+        the changes made by other processes.
+    """
+
+    def __init__(self, path):
+        from tinydb import TinyDB
+        self.db = TinyDB(path, storage=AtomicJSONStorage)
+        self.lock = FileLock(path)
+        self.path = path
+        self._values = {}
+
+    def _table(self, table):
+        return self.db.table(table)
+
+    def tables(self):
+        return sorted(self.db.tables())
+
+    def get(self, table, id):
+        document = self._table(table).get(doc_id=id)
+        return dict(document) if document is not None else None
+
+    def get_many(self, table, ids):
+        ids = set(ids)
+        return {
+            document.doc_id: dict(document)
+            for document in self._table(table).all()
+            if document.doc_id in ids
+        }
+
+    def all(self, table):
+        return [
+            (document.doc_id, dict(document))
+            for document in self._table(table).all()
+        ]
+
+    def ids(self, table):
+        return [int(id) for id in (self.db.storage.read() or {}).get(table, {})]
+
+    def values(self, table, key):
+        # Every write replaces the file, so the values read last are kept
+        # as long as it has the same inode, size and modification time.
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            signature = None
+        cached = self._values.get((table, key))
+        if cached is None or cached[0] != signature:
+            cached = self._values[table, key] = (signature, {
+                int(id): document.get(key) for id, document in (self.db.storage.read() or {}).get(table, {}).items()
+            })
+        return dict(cached[1])
+
+    def _fresh_table(self, table):
+        """ Return the table without its cached next id, which may have
+            been taken by another process.
+        """
+        self.db._tables.pop(table, None)
+        return self._table(table)
+
+    def insert(self, table, document):
+        with self.lock:
+            return self._fresh_table(table).insert(document)
+
+    def insert_many(self, table, documents):
+        with self.lock:
+            return self._fresh_table(table).insert_multiple(documents)
+
+    def update(self, table, id, document):
+        from tinydb.table import Document
+        with self.lock:
+            self._fresh_table(table).upsert(Document(document, doc_id=id))
+
+    def update_many(self, table, documents):
+        if not documents:
+            return
+        with self.lock:
+            data = self.db.storage.read() or {}
+            stored = data.setdefault(table, {})
+            for id, document in documents.items():
+                stored[str(id)] = document
+            self.db.storage.write(data)
+            self.db._tables.pop(table, None)
+
+    def close(self):
+        self.db.close()
+
+
+class SQLiteStorage(BaseStorage):
+    """ Storage backend using the standard library sqlite3 module.
+        Every table stores the json document along with indexed columns
+        listed in COLUMNS. Tournament rounds and matchs are kept in their
+        own tables. sqlite serializes its own writes, the lock only guards
+        the version checks of BaseModel.save.
+    """
+
+    COLUMNS = {
+        'player': ('first_name', 'last_name', 'rank'),
+        'tournament': ('name',),
+    }
+    INDEXES = {
+        'player': (('rank',), ('last_name', 'first_name')),
+        'tournament': (('name',),),
+    }
+    CHILD_TABLES = ('round', 'match')
+
+    def __init__(self, path):
+        import sqlite3
+        self.connection = sqlite3.connect(path)
+        self.lock = FileLock(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self._known_tables = set()
+        self._create_rounds_tables()
+
+    def _create_rounds_tables(self):
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS "round" ('
+                'tournament_id INTEGER NOT NULL, idx INTEGER NOT NULL, '
+                'data TEXT NOT NULL, PRIMARY KEY (tournament_id, idx))'
+            )
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS "match" ('
+                'tournament_id INTEGER NOT NULL, round_idx INTEGER NOT NULL, '
+                'position INTEGER NOT NULL, player_1 INTEGER, player_2 INTEGER, '
+                'data TEXT NOT NULL, '
+                'PRIMARY KEY (tournament_id, round_idx, position))'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS "match_player_1" ON "match" (player_1)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS "match_player_2" ON "match" (player_2)'
+            )
+
+    def _ensure_table(self, table):
+        """ Create table and its indexes on first use. """
+        if table in self._known_tables:
+            return
+        columns = "".join(f', "{column}"' for column in self.COLUMNS.get(table, ()))
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                f'id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL{columns})'
+            )
+            for fields in self.INDEXES.get(table, ()):
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_{"_".join(fields)}" '
+                    f'ON "{table}" ({", ".join(fields)})'
+                )
+        self._known_tables.add(table)
+
+    def tables(self):
+        rows = self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%'"
+        )
+        return sorted(
+            name for name, in rows if name not in self.CHILD_TABLES
+        )
+
+    def _load(self, table, id, data):
+        document = json.loads(data)
+        if table == 'tournament':
+            document['rounds'] = self._load_rounds(id)
+        return document
+
+    def _load_rounds(self, tournament_id):
+        rounds = [
+            json.loads(data) for data, in self.connection.execute(
+                'SELECT data FROM "round" WHERE tournament_id = ? ORDER BY idx',
+                (tournament_id,)
+            )
+        ]
+        for round in rounds:
+            round['matchs'] = []
+        for round_idx, data in self.connection.execute(
+            'SELECT round_idx, data FROM "match" WHERE tournament_id = ? '
+            'ORDER BY round_idx, position',
+            (tournament_id,)
+        ):
+            rounds[round_idx]['matchs'].append(json.loads(data))
+        return rounds
+
+    def _dump_rounds(self, tournament_id, rounds):
+        self.connection.execute(
+            'DELETE FROM "round" WHERE tournament_id = ?', (tournament_id,)
+        )
+        self.connection.execute(
+            'DELETE FROM "match" WHERE tournament_id = ?', (tournament_id,)
+        )
+        for idx, round in enumerate(rounds):
+            matchs = round.get('matchs', [])
+            self.connection.execute(
+                'INSERT INTO "round" (tournament_id, idx, data) VALUES (?, ?, ?)',
+                (
+                    tournament_id, idx,
+                    json.dumps({k: v for k, v in round.items() if k != 'matchs'})
+                )
+            )
+            self.connection.executemany(
+                'INSERT INTO "match" (tournament_id, round_idx, position, '
+                'player_1, player_2, data) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        tournament_id, idx, position, match.get('player_1'),
+                        match.get('player_2'), json.dumps(match)
+                    )
+                    for position, match in enumerate(matchs)
+                ]
+            )
+
+    def _row(self, table, document):
+        """ Return the json payload and indexed column values of a document. """
+        if table == 'tournament':
+            document = {k: v for k, v in document.items() if k != 'rounds'}
+        columns = self.COLUMNS.get(table, ())
+        return json.dumps(document), [document.get(column) for column in columns]
+
+    def get(self, table, id):
+        self._ensure_table(table)
+        row = self.connection.execute(
+            f'SELECT data FROM "{table}" WHERE id = ?', (id,)
+        ).fetchone()
+        return self._load(table, id, row[0]) if row else None
+
+    def get_many(self, table, ids):
+        self._ensure_table(table)
+        ids = list(set(ids))
+        documents = {}
+        # Stay below sqlite's default limit of bound parameters.
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            rows = self.connection.execute(
+                f'SELECT id, data FROM "{table}" WHERE id IN '
+                f'({", ".join("?" * len(chunk))})',
+                chunk
+            )
+            for id, data in rows:
+                documents[id] = self._load(table, id, data)
+        return documents
+
+    def all(self, table):
+        self._ensure_table(table)
+        rows = self.connection.execute(f'SELECT id, data FROM "{table}" ORDER BY id')
+        return [(id, self._load(table, id, data)) for id, data in rows]
+
+    def ids(self, table):
+        self._ensure_table(table)
+        return [id for id, in self.connection.execute(f'SELECT id FROM "{table}" ORDER BY id')]
+
+    def values(self, table, key):
+        self._ensure_table(table)
+        rows = self.connection.execute(f'SELECT id, json_extract(data, ?) FROM "{table}"', (f'$.{key}',))
+        return dict(rows)
+
+    def _insert(self, table, document):
+        data, values = self._row(table, document)
+        columns = "".join(f', "{column}"' for column in self.COLUMNS.get(table, ()))
+        cursor = self.connection.execute(
+            f'INSERT INTO "{table}" (data{columns}) '
+            f'VALUES ({", ".join("?" * (len(values) + 1))})',
+            [data, *values]
+        )
+        if table == 'tournament':
+            self._dump_rounds(cursor.lastrowid, document.get('rounds', []))
+        return cursor.lastrowid
+
+    def insert(self, table, document):
+        self._ensure_table(table)
+        with self.connection:
+            return self._insert(table, document)
+
+    def insert_many(self, table, documents):
+        self._ensure_table(table)
+        with self.connection:
+            return [self._insert(table, document) for document in documents]
+
+    def _replace(self, table, id, document):
+        data, values = self._row(table, document)
+        columns = "".join(f', "{column}"' for column in self.COLUMNS.get(table, ()))
+        self.connection.execute(
+            f'INSERT OR REPLACE INTO "{table}" (id, data{columns}) '
+            f'VALUES ({", ".join("?" * (len(values) + 2))})',
+            [id, data, *values]
+        )
+        if table == 'tournament':
+            self._dump_rounds(id, document.get('rounds', []))
+
+    def update(self, table, id, document):
+        self._ensure_table(table)
+        with self.connection:
+            self._replace(table, id, document)
+
+    def update_many(self, table, documents):
+        self._ensure_table(table)
+        with self.connection:
+            for id, document in documents.items():
+                self._replace(table, id, document)
+
+    def close(self):
+        self.connection.close()
+
+
+BACKENDS = {
+    'tinydb': TinyDBStorage,
+    'sqlite': SQLiteStorage,
+}
+
+
+def create_storage(backend, path):
+    """ Return a storage instance for the backend name given in settings. """
+    try:
+        return BACKENDS[backend](path)
+    except KeyError:
+        raise ValueError(f"Unknown database backend: {backend}")
+
+
+def backend_for(path, default):
+    """ Return the backend name matching the extension of a database path. """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return 'tinydb'
+    if extension in ('.sqlite', '.sqlite3', '.db'):
+        return 'sqlite'
+    return default
+
+
+class LazyStorage:
+    """ Proxy opening the storage backend on first use, so that importing
+        the models neither reads nor creates the database.
+    """
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+        self._storage = None
+
+    def open(self, backend, path):
+        """ Use another database, closing the current one if it is open. """
+        if self._storage is not None:
+            self._storage.close()
+        self.__dict__.clear()
+        self.__init__(backend, path)
+
+    def __getattr__(self, name):
+        if self._storage is None:
+            self._storage = create_storage(self.backend, self.path)
+        attribute = getattr(self._storage, name)
+        # Cache storage methods on the proxy so next calls skip this hook.
+        setattr(self, name, attribute)
+        return attribute
@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+
+class TiebreakIndex:
+    """ Index of the (opponent, result) of every player by round index,
+        along with the scores and tie-breaks it implies:
+        - Buchholz: sum of the scores of the opponents.
+        - Sonneborn-Berger: sum of the scores of the opponents, weighted by
+          the result against each of them.
+        - progressive: sum of the cumulated scores after each round.
+        Tie-breaks are updated as results arrive, in time proportional to
+        the number of rounds. Byes count in scores but have no opponent.
+    """
+
+    def __init__(self, players=()):
+        self.games = {player: {} for player in players}
+        self.scores = dict.fromkeys(self.games, 0)
+        self.nb_rounds = 0
+        self._buchholz = dict.fromkeys(self.games, 0)
+        self._sonneborn_berger = dict.fromkeys(self.games, 0)
+        # Sum of round number times score of the round, for progressive.
+        self._weighted = dict.fromkeys(self.games, 0)
+
+    @classmethod
+    def build(cls, players, rounds, bye_score):
+        """ Index the matchs and byes of a list of rounds in one pass. """
+        index = cls(players)
+        games, scores, weighted = index.games, defaultdict(int, index.scores), defaultdict(int, index._weighted)
+        for round_index, round in enumerate(rounds):
+            for match in round.matchs:
+                for player, opponent, score in (
+                    (match.player_1, match.player_2, match.score_player_1),
+                    (match.player_2, match.player_1, match.score_player_2),
+                ):
+                    games.setdefault(player, {})[round_index] = (opponent, score)
+                    scores[player] += score
+                    weighted[player] += score * (round_index + 1)
+            if round.bye is not None:
+                scores[round.bye] += bye_score
+                weighted[round.bye] += bye_score * (round_index + 1)
+        index.scores, index._weighted = dict(scores), dict(weighted)
+        index.nb_rounds = len(rounds)
+        buchholz, sonneborn_berger = defaultdict(int), defaultdict(int)
+        for player, player_games in games.items():
+            for opponent, score in player_games.values():
+                buchholz[player] += index.scores[opponent]
+                sonneborn_berger[player] += score * index.scores[opponent]
+        index._buchholz = {player: buchholz[player] for player in index.scores}
+        index._sonneborn_berger = {player: sonneborn_berger[player] for player in index.scores}
+        return index
+
+    def add_player(self, player):
+        if player not in self.games:
+            self.games[player] = {}
+            self.scores[player] = 0
+            self._buchholz[player] = 0
+            self._sonneborn_berger[player] = 0
+            self._weighted[player] = 0
+
+    def _propagate(self, player, sign):
+        """ Add (sign=1) or remove (sign=-1) the score of a player from the
+            tie-breaks of its opponents.
+        """
+        score = sign * self.scores[player]
+        for round_index, (opponent, _) in self.games[player].items():
+            self._buchholz[opponent] += score
+            self._sonneborn_berger[opponent] += self.games[opponent][round_index][1] * score
+
+    def add_game(self, round_index, player_1, player_2, score_1=0, score_2=0):
+        """ Index a new match. """
+        self.nb_rounds = max(self.nb_rounds, round_index + 1)
+        for player, opponent in ((player_1, player_2), (player_2, player_1)):
+            self.games[player][round_index] = (opponent, 0)
+            self._buchholz[player] += self.scores[opponent]
+        self.set_result(round_index, player_1, player_2, score_1, score_2)
+
+    def set_result(self, round_index, player_1, player_2, score_1, score_2):
+        """ Update the index with the new result of an indexed match. """
+        old_1, old_2 = self.games[player_1][round_index][1], self.games[player_2][round_index][1]
+        if (old_1, old_2) == (score_1, score_2):
+            return
+        self._propagate(player_1, -1)
+        self._propagate(player_2, -1)
+        for player, opponent, old, score in (
+            (player_1, player_2, old_1, score_1),
+            (player_2, player_1, old_2, score_2),
+        ):
+            self.games[player][round_index] = (opponent, score)
+            self.scores[player] += score - old
+            self._weighted[player] += (score - old) * (round_index + 1)
+        self._propagate(player_1, 1)
+        self._propagate(player_2, 1)
+
+    def add_bye(self, round_index, player, score):
+        """ Give the score of a bye to a player. """
+        self.nb_rounds = max(self.nb_rounds, round_index + 1)
+        self._propagate(player, -1)
+        self.scores[player] += score
+        self._weighted[player] += score * (round_index + 1)
+        self._propagate(player, 1)
+
+    def opponents(self, player):
+        """ Return the (opponent, result) of a player in round order. """
+        return [self.games[player][round_index] for round_index in sorted(self.games[player])]
+
+    def buchholz(self, player):
+        return self._buchholz[player]
+
+    def sonneborn_berger(self, player):
+        return self._sonneborn_berger[player]
+
+    def progressive(self, player):
+        return (self.nb_rounds + 1) * self.scores[player] - self._weighted[player]
+
+    def key(self, player, tiebreaks):
+        """ Return the score of a player followed by the given tie-breaks. """
+        return (self.scores[player], *(getattr(self, name)(player) for name in tiebreaks))
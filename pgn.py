@@ -0,0 +1,129 @@
+""" Import the games of a tournament from a PGN file, and export the games
+    of tournaments to PGN. Both stream the file one game at a time.
+
+    Imported games are matched by round and by players, White being written
+    "last name, first name" and playing first. Their moves are stored in the
+    move archive and their result, if any, is entered.
+    Exported games are the finished or recorded matchs of the tournaments.
+
+    Usage:
+        python pgn.py [--database PATH] import TOURNAMENT games.pgn
+        python pgn.py [--database PATH] export TOURNAMENT [TOURNAMENT ...] [--output games.pgn]
+"""
+import argparse
+import sys
+from importer import batches, find_match
+from models import Player, Tournament, base
+from models.pgn import SCORES, from_san, match_result, parse_movetext, read_games, write_game
+
+
+BATCH_SIZE = 1000
+
+
+def player_name(player):
+    return f"{player.last_name}, {player.first_name}"
+
+
+def export_games(tournaments, file):
+    """ Write the finished or recorded matchs of tournaments and return the
+        number of games written.
+    """
+    exported = 0
+    for tournament in tournaments:
+        players = {player.id: player for player in Player.get_many(tournament.players)}
+        for round_index, round in enumerate(tournament.rounds):
+            date = round.start_date.strftime('%Y.%m.%d') if round.start_date else '????.??.??'
+            for match in round.matchs:
+                if not match.is_finished and match.game is None:
+                    continue
+                tags = {
+                    'Event': tournament.name,
+                    'Date': date,
+                    'Round': str(round_index + 1),
+                    'White': player_name(players[match.player_1]),
+                    'Black': player_name(players[match.player_2]),
+                }
+                write_game(file, tags, match.moves, match_result(match))
+                exported += 1
+    return exported
+
+
+def import_games(tournament, path, batch_size=BATCH_SIZE):
+    """ Record the games of a PGN file in the matchs of a tournament,
+        saving them batch by batch. Return (number imported, list of errors).
+    """
+    imported, errors = 0, []
+    names = {}
+    for player in Player.get_many(tournament.players):
+        names.setdefault(player_name(player).lower(), []).append(player.id)
+
+    def player_id(name):
+        ids = names.get(name.lower(), [])
+        if len(ids) != 1:
+            raise ValueError(f"{'no' if not ids else 'several'} players named {name!r} in {tournament.name}")
+        return ids[0]
+
+    def valid_games(file):
+        for number, (tags, movetext) in enumerate(read_games(file), 1):
+            try:
+                white, black = player_id(tags.get('White', '?')), player_id(tags.get('Black', '?'))
+                round_number = int(tags.get('Round', '?').split('.')[0])
+                match = find_match(tournament, round_number, white, black)
+                if match.player_1 != white:
+                    raise ValueError(f"{tags['White']} played black in round {round_number}")
+                sans, result = parse_movetext(movetext)
+                moves = from_san(sans)
+            except (KeyError, ValueError) as error:
+                errors.append(f"game {number}: {error}")
+                continue
+            if result in SCORES:
+                tournament.settle(match, {'1-0': white, '0-1': black}.get(result))
+            yield match, moves
+
+    with open(path) as file:
+        for batch in batches(valid_games(file), batch_size):
+            tournament.set_games(batch)
+            imported += len(batch)
+    return imported, errors
+
+
+def get_tournament(id):
+    tournament = Tournament.get(id)
+    if tournament is None:
+        sys.exit(f"unknown tournament {id}")
+    return tournament
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import or export the games of tournaments as PGN.')
+    parser.add_argument(
+        '--database', metavar='PATH',
+        help='database to use instead of settings.DATABASE_NAME'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help='record the games of a PGN file in a tournament')
+    import_parser.add_argument('tournament', type=int)
+    import_parser.add_argument('path')
+    import_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    export_parser = commands.add_parser('export', help='write the games of tournaments as PGN')
+    export_parser.add_argument('tournaments', type=int, nargs='+')
+    export_parser.add_argument('--output', metavar='PATH', help='file to write instead of the standard output')
+    args = parser.parse_args()
+    if args.database:
+        base.open_database(args.database)
+    if args.command == 'import':
+        try:
+            imported, errors = import_games(get_tournament(args.tournament), args.path, args.batch_size)
+        except ValueError as error:
+            sys.exit(error)
+        for error in errors:
+            print(error)
+        print(f"{imported} games imported, {len(errors)} rejected")
+    else:
+        tournaments = (get_tournament(id) for id in args.tournaments)
+        if args.output:
+            with open(args.output, 'w') as file:
+                exported = export_games(tournaments, file)
+            print(f"{exported} games exported to {args.output}")
+        else:
+            export_games(tournaments, sys.stdout)
@@ -0,0 +1,188 @@
+""" Opt-in instrumentation of the application.
+
+    Once enabled, every model get/all/save, every document load/dump of the
+    codec and every public method of the controllers is counted and timed,
+    along with the bytes written to the database and the result journal
+    during each call. A summary is printed at exit, and a cProfile capture
+    of a single menu action can be requested.
+
+    Nothing is patched, nor cProfile imported, until enable() is called,
+    so a disabled profiler costs nothing.
+
+    Enable with `python main.py --profile [--profile-action ACTION]` or by
+    setting the CHESS_PROFILE (and CHESS_PROFILE_ACTION) environment
+    variables, ACTION being a qualified name such as
+    TournamentManager.enter_results.
+"""
+import atexit
+import functools
+import os
+import time
+from array import array
+from collections import defaultdict
+
+
+PROFILE_ENV = 'CHESS_PROFILE'
+PROFILE_ACTION_ENV = 'CHESS_PROFILE_ACTION'
+MODEL_METHODS = ('get', 'all', 'save')
+CODEC_METHODS = ('load', 'dump')
+
+
+class Stat:
+    """ Durations and bytes written of the calls to an instrumented name. """
+
+    def __init__(self):
+        self.times = array('d')
+        self.written = 0
+
+    def percentile(self, fraction):
+        times = sorted(self.times)
+        return times[round(fraction * (len(times) - 1))]
+
+
+class Profiler:
+
+    def __init__(self, profile_action=None):
+        self.profile_action = profile_action
+        self.actions = defaultdict(Stat)
+        self.operations = defaultdict(Stat)
+        self.cprofile = None
+        if profile_action:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+        self._open = []
+        self._open_names = set()
+
+    def _timed(self, stats, name, function, bind_name=False):
+        """ Return function wrapped to record its calls in stats[name]. When
+            bind_name is True, name is prefixed by the class the method is
+            called on.
+        """
+        profiler = self
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            key = name
+            if bind_name:
+                owner = args[0] if isinstance(args[0], type) else type(args[0])
+                key = f'{owner.__name__}.{name}'
+            if key in profiler._open_names:
+                # Already timed by an overriding method calling super().
+                return function(*args, **kwargs)
+            record = [key, 0]
+            profiler._open.append(record)
+            profiler._open_names.add(key)
+            capture = profiler.cprofile is not None and key == profiler.profile_action
+            if capture:
+                profiler.cprofile.enable()
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if capture:
+                    profiler.cprofile.disable()
+                profiler._open.pop()
+                profiler._open_names.discard(key)
+                stat = stats[key]
+                stat.times.append(elapsed)
+                stat.written += record[1]
+        return timed
+
+    def written(self, nbytes):
+        """ Charge bytes written to every call in progress. """
+        for record in self._open:
+            record[1] += nbytes
+
+    def _patch(self, cls, name, stats, label, bind_name=False):
+        attribute = cls.__dict__[name]
+        if isinstance(attribute, classmethod):
+            setattr(cls, name, classmethod(self._timed(stats, label, attribute.__func__, bind_name)))
+        else:
+            setattr(cls, name, self._timed(stats, label, attribute, bind_name))
+
+    def install(self):
+        """ Patch models, codec, storages and controllers. """
+        import inspect
+        from controllers import controllers
+        from controllers.base import BaseManager
+        from models import base
+        from models.codec import Codec
+        from models.journal import ResultJournal
+        from models.storage import AtomicJSONStorage, SQLiteStorage
+
+        models, pending = [], [base.BaseModel]
+        while pending:
+            cls = pending.pop()
+            models.append(cls)
+            pending.extend(cls.__subclasses__())
+        for cls in models:
+            for name in MODEL_METHODS:
+                if name in cls.__dict__:
+                    self._patch(cls, name, self.operations, name, bind_name=True)
+        for name in CODEC_METHODS:
+            self._patch(Codec, name, self.operations, f'codec.{name}')
+        for _, cls in inspect.getmembers(controllers, inspect.isclass):
+            if issubclass(cls, BaseManager) and cls.__module__ == controllers.__name__:
+                for name, attribute in list(vars(cls).items()):
+                    if inspect.isfunction(attribute) and not name.startswith('_'):
+                        self._patch(cls, name, self.actions, f'{cls.__name__}.{name}')
+
+        profiler = self
+        atomic_write = AtomicJSONStorage.write
+        sqlite_row = SQLiteStorage._row
+        journal_append = ResultJournal.append
+
+        def write(storage, data):
+            atomic_write(storage, data)
+            profiler.written(os.path.getsize(storage.path))
+
+        def row(storage, table, document):
+            data, values = sqlite_row(storage, table, document)
+            profiler.written(len(data))
+            return data, values
+
+        def append(journal, *args):
+            size = os.path.getsize(journal.path) if os.path.exists(journal.path) else 0
+            journal_append(journal, *args)
+            profiler.written(os.path.getsize(journal.path) - size)
+
+        AtomicJSONStorage.write = write
+        SQLiteStorage._row = row
+        ResultJournal.append = append
+
+    def report(self):
+        for title, stats in (('action', self.actions), ('operation', self.operations)):
+            print(
+                f"\n{title:<40} {'calls':>8} {'total (ms)':>11} {'mean (ms)':>10} "
+                f"{'p95 (ms)':>9} {'written (kB)':>13}"
+            )
+            for name, stat in sorted(stats.items(), key=lambda x: -sum(x[1].times)):
+                total = sum(stat.times)
+                print(
+                    f"{name:<40} {len(stat.times):>8} {total * 1000:>11.2f} "
+                    f"{total / len(stat.times) * 1000:>10.3f} {stat.percentile(0.95) * 1000:>9.3f} "
+                    f"{stat.written / 1000:>13.1f}"
+                )
+        if self.cprofile is not None:
+            import pstats
+            print(f"\ncProfile of {self.profile_action}:")
+            pstats.Stats(self.cprofile).sort_stats('cumulative').print_stats(25)
+
+
+profiler = None
+
+
+def enable(profile_action=None):
+    """ Instrument the application and print the summary at exit. """
+    global profiler
+    if profiler is None:
+        profiler = Profiler(profile_action)
+        profiler.install()
+        atexit.register(profiler.report)
+    return profiler
+
+
+def enabled_from_environment():
+    """ Return True if the environment asks for profiling. """
+    return bool(os.environ.get(PROFILE_ENV) or os.environ.get(PROFILE_ACTION_ENV))
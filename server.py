@@ -0,0 +1,331 @@
+""" Local HTTP/JSON API letting the boards of a tournament enter their
+    results concurrently.
+
+    Endpoints:
+        GET  /tournaments                     tournaments headers
+        GET  /tournaments/<id>/active-match   active round and its pending matchs
+        POST /tournaments/<id>/results        {"round": 1, "player_1": 3, "player_2": 7, "winner": 3}
+        GET  /tournaments/<id>/standings      players sorted by score and rank
+        GET  /tournaments/<id>/report         every round and match
+        GET  /stats                           operations and batches of the writer
+
+    winner is a player id or "draw". Reads are answered from the models in
+    memory, refreshed first with the changes saved by other processes such
+    as results entered from a terminal. Every write goes through a single writer task which applies the
+    queued results in batches and saves each modified tournament once per
+    batch, before answering the clients of the batch.
+
+    Usage: python server.py [--host 127.0.0.1] [--port 8000]
+"""
+import argparse
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from importer import find_match
+from models import Player, StaleObjectError, Tournament
+
+
+# Maximum number of queued operations applied before a save.
+BATCH_SIZE = 100
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def http_error(error):
+    """ Return the HTTPError answering an error raised by the models:
+        a 409 for a conflict with another process, a 404 for something
+        missing and a 400 for an invalid operation.
+    """
+    if isinstance(error, StaleObjectError):
+        return HTTPError(HTTPStatus.CONFLICT, str(error))
+    if isinstance(error, LookupError):
+        return HTTPError(HTTPStatus.NOT_FOUND, str(error))
+    if isinstance(error, ValueError):
+        return HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+    return error
+
+
+def get_tournament(id, refresh=False):
+    """ Return the tournament of given id, raising a 404 if it is unknown.
+        With refresh, the changes saved by other processes are read first.
+    """
+    tournament = Tournament.get(int(id))
+    if tournament is None:
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown tournament {id}")
+    if refresh:
+        tournament.refresh()
+    return tournament
+
+
+def get_ready_tournament(id, refresh=False):
+    """ Return the tournament of given id if all its players are enrolled. """
+    tournament = get_tournament(id, refresh)
+    if not tournament.is_ready:
+        raise HTTPError(HTTPStatus.CONFLICT, f"{tournament} is waiting for players")
+    return tournament
+
+
+def needs_round(tournament):
+    """ Return True if the next round of the tournament can be paired. """
+    rounds = tournament.rounds
+    return not rounds or (rounds[-1].is_finished and len(rounds) < tournament.nb_rounds)
+
+
+def commit(tournament):
+    """ Pair the next round if the active one is over, then save. """
+    if needs_round(tournament):
+        tournament.generate_next_round()  # saves the tournament
+    else:
+        tournament.save()
+
+
+class Writer:
+    """ Single task applying every write to the models. Operations queued
+        while a batch is being saved are applied together in the next one,
+        so concurrent results cost one save per tournament and per batch.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue()
+        self.operations = 0
+        self.batches = 0
+
+    async def submit(self, tournament_id, operation):
+        """ Queue operation(tournament) and return its result once the
+            tournament is saved.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((tournament_id, operation, future))
+        return await future
+
+    async def run(self):
+        while True:
+            jobs = [await self.queue.get()]
+            while len(jobs) < self.batch_size and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            try:
+                self.apply(jobs)
+            except Exception as error:
+                # Fail the batch but keep serving the next ones.
+                for _, _, future in jobs:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def apply(self, jobs):
+        """ Run a batch of operations, then save the modified tournaments.
+            The operations on a tournament which cannot be saved fail, and
+            the tournament is evicted so that the next batch starts again
+            from its stored version.
+        """
+        modified, outcomes = {}, []
+        for tournament_id, operation, future in jobs:
+            try:
+                # Changes saved by other processes are read once per batch.
+                tournament = modified.get(tournament_id) or get_ready_tournament(tournament_id, refresh=True)
+                outcomes.append((tournament_id, future, operation(tournament), None))
+                modified[tournament.id] = tournament
+            except (HTTPError, LookupError, ValueError) as error:
+                outcomes.append((tournament_id, future, None, http_error(error)))
+        failed = {}
+        for tournament in modified.values():
+            try:
+                commit(tournament)
+            except Exception as error:
+                # Such as an archived tournament, or one paired or enrolled
+                # from another process.
+                tournament.evict()
+                failed[tournament.id] = http_error(error)
+        outcomes = [
+            (future, None, failed[tournament_id]) if tournament_id in failed else (future, result, error)
+            for tournament_id, future, result, error in outcomes
+        ]
+        for future, result, error in outcomes:
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        self.operations += len(jobs)
+        self.batches += 1
+
+
+class Application:
+    """ Route requests to the tournament operations. """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.routes = [
+            ('GET', re.compile(r'/tournaments'), self.list_tournaments),
+            ('GET', re.compile(r'/tournaments/(\d+)/active-match'), self.active_match),
+            ('POST', re.compile(r'/tournaments/(\d+)/results'), self.submit_result),
+            ('GET', re.compile(r'/tournaments/(\d+)/standings'), self.standings),
+            ('GET', re.compile(r'/tournaments/(\d+)/report'), self.report),
+            ('GET', re.compile(r'/stats'), self.stats),
+        ]
+
+    async def dispatch(self, method, path, body):
+        """ Return the (status, payload) answering a request. """
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path.split('?')[0].rstrip('/'))
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                return HTTPStatus.OK, await handler(body, *match.groups())
+            except (HTTPError, LookupError, ValueError) as error:
+                error = http_error(error)
+                return error.status, {'error': str(error)}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed on {path}"}
+        return HTTPStatus.NOT_FOUND, {'error': f"unknown path {path}"}
+
+    async def list_tournaments(self, body):
+        return [{'id': tournament.id, **tournament.header} for tournament in Tournament.all()]
+
+    async def active_match(self, body, id):
+        tournament = get_ready_tournament(id, refresh=True)
+        if needs_round(tournament):
+            await self.writer.submit(tournament.id, lambda tournament: None)
+        active_round = tournament.rounds[-1]
+        if active_round.is_finished:
+            return {'round': None, 'match': None, 'pending': []}
+        pending = [
+            {'board': board, 'player_1': match.player_1, 'player_2': match.player_2}
+            for board, match in enumerate(active_round.matchs, 1) if not match.is_finished
+        ]
+        return {'round': active_round.index, 'match': pending[0], 'pending': pending}
+
+    async def submit_result(self, body, id):
+        try:
+            round_number = int(body['round'])
+            player_1, player_2 = int(body['player_1']), int(body['player_2'])
+            winner = body.get('winner', 'draw')
+            winner = None if winner == 'draw' else int(winner)
+        except (KeyError, TypeError, ValueError):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "expected round, player_1, player_2 and winner (a player id or 'draw')"
+            )
+        if winner not in (None, player_1, player_2):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"player {winner} does not play this match")
+
+        def operation(tournament):
+            match = find_match(tournament, round_number, player_1, player_2)
+            tournament.settle(match, winner)
+            return {'round': round_number, **match.dict}
+
+        return await self.writer.submit(int(id), operation)
+
+    async def standings(self, body, id):
+        tournament = get_tournament(id, refresh=True)
+        players = Player.get_many(tournament.get_sorted_players())
+        return [
+            {
+                'id': player.id,
+                'name': str(player),
+                'rank': player.rank,
+                'score': tournament.total_score(player),
+            }
+            for player in players
+        ]
+
+    async def report(self, body, id):
+        tournament = get_tournament(id, refresh=True)
+        return {'id': tournament.id, 'status': tournament.status, **tournament.dict}
+
+    async def stats(self, body):
+        return {'operations': self.writer.operations, 'batches': self.writer.batches}
+
+    async def read_request(self, reader):
+        """ Return (method, path, body, keep alive) or None once the client
+            closed the connection.
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = None
+        length = int(headers.get('content-length') or 0)
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "body is not valid json")
+            if not isinstance(body, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a json object")
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+        return method, path, body, keep_alive
+
+    async def handle(self, reader, stream):
+        """ Serve the requests of a connection until it is closed. """
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await self.dispatch(method, path, body)
+                except HTTPError as error:
+                    status, payload, keep_alive = error.status, {'error': str(error)}, False
+                except Exception as error:
+                    status, payload, keep_alive = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(error)}, False
+                content = json.dumps(payload).encode()
+                stream.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+                )
+                await stream.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            stream.close()
+
+
+async def serve(host='127.0.0.1', port=8000):
+    writer = Writer()
+    application = Application(writer)
+    writer_task = asyncio.create_task(writer.run())
+    server = await asyncio.start_server(application.handle, host, port)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        writer_task.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the tournaments over a local json api.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -1,3 +1,48 @@
+import os
 
 
-DATABASE_NAME = 'db.json'
+# Database path, which can be overridden by the CHESS_DATABASE environment
+# variable or the --database option of main.py. The backend is guessed
+# from its extension: .json for 'tinydb', .sqlite, .sqlite3 or .db for
+# 'sqlite', DATABASE_BACKEND otherwise.
+DATABASE_BACKEND = 'tinydb'
+DATABASE_NAME = os.environ.get('CHESS_DATABASE', 'db.json')
+
+# Maximum number of model instances kept in the identity map.
+CACHE_SIZE = 1024
+
+# Points given to a player left without opponent in a round.
+BYE_SCORE = 1
+
+# Tie-breaks applied in order to players with the same score, among
+# 'buchholz', 'sonneborn_berger' and 'progressive', before the rank.
+TIEBREAKS = ('buchholz', 'sonneborn_berger', 'progressive')
+
+# Append-only log of match results, stored in the database path followed
+# by JOURNAL_SUFFIX and compacted into the database once it holds
+# JOURNAL_COMPACT_THRESHOLD events.
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_COMPACT_THRESHOLD = 100
+
+# Folder, named after the database followed by ARCHIVE_SUFFIX, holding the
+# per-season compressed archives of finished tournaments.
+ARCHIVE_SUFFIX = '.archives'
+
+# Append-only archive of the moves of games, named after the database
+# followed by MOVES_SUFFIX, with .bin for the moves and .idx for their index.
+MOVES_SUFFIX = '.moves'
+
+# Number of objects displayed per page in listings.
+PAGE_SIZE = 20
+
+# Elo rating given to new players and maximum rating change per game.
+DEFAULT_RATING = 1500
+K_FACTOR = 20
+
+# Standings forecast: share of draws between equally rated players, maximum
+# number of simulated tournaments, number of games simulated in all which
+# lowers it for large fields, and number of top places reported.
+DRAW_RATE = 0.3
+FORECAST_SIMULATIONS = 20000
+FORECAST_GAMES = 1000000
+FORECAST_TOP = 3
@@ -1,6 +1,9 @@
 import string
+from itertools import count, product
 
 
 def index_generator():
-    for char in string.ascii_lowercase:
-        yield char
+    """ Yield menu indexes: a to z, then aa, ab, ... zz, aaa, ... """
+    for length in count(1):
+        for letters in product(string.ascii_lowercase, repeat=length):
+            yield ''.join(letters)
@@ -1,10 +1,54 @@
 import os
 from abc import ABC, abstractmethod
+from settings import PAGE_SIZE
+
+
+class Console:
+    """ Terminal used by the views to interact with users. """
+
+    def input(self, prompt=''):
+        return input(prompt)
+
+    def print(self, *args, **kwargs):
+        print(*args, **kwargs)
+
+    def clear(self):
+        """ Clear user interface"""
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    def run_action(self, option):
+        """ Run the action of the menu option selected by the user. """
+        option.get('action')()
+
+
+class ListPages:
+    """ A list of objects seen page by page, like the search results of
+        the models.
+    """
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    def __len__(self):
+        return len(self.objects)
+
+    def page(self, number, size):
+        return self.objects[number * size:(number + 1) * size]
+
+
+def prefix_search(objects):
+    """ Return a search of the objects whose name starts with a query. """
+    def search(query):
+        query = query.strip().lower()
+        return [obj for obj in objects if str(obj).lower().startswith(query)]
+    return search
 
 
 class BaseView(ABC):
     """ Abstract Class for handling common interaction with users."""
 
+    console = Console()
+
     @abstractmethod
     def setup(self, controller):
         """ Required method for child classes.
@@ -23,42 +67,85 @@ class BaseView(ABC):
         )
 
     def start(self):
-        """ Display the view's menu and get customer choice."""
-        user_choice = input(
-            "Select an action from the menu:\n" +
-            f"{self.menu}\n"
-            + "=> "
-        )
-        self.execute(user_choice)
+        """ Display the view's menu until the customer makes a valid choice."""
+        while not self.execute(
+            self.console.input(
+                "Select an action from the menu:\n" +
+                f"{self.menu}\n"
+                + "=> "
+            )
+        ):
+            self.clear()
 
     def execute(self, user_choice):
-        """ call the function given a user choice and the view mapping"""
+        """ call the function given a user choice and the view mapping,
+            return False if the choice is invalid.
+        """
         if user_choice in self.mapping:
-            self.mapping.get(user_choice).get('action')()
-        else:
-            input("Invalid action selected, please try again.\n")
-            self.clear()
-            self.start()
+            self.console.run_action(self.mapping.get(user_choice))
+            return True
+        self.console.input("Invalid action selected, please try again.\n")
+        return False
 
     def clear(self):
         """ Clear user interface"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.console.clear()
+
+    def get_positive_int(self, prompt, optional=False):
+        """ Ask for a positive integer until one is entered and return it.
+            If optional, an empty answer is accepted and returns None.
+        """
+        while True:
+            answer = self.console.input(prompt).strip()
+            if not answer and optional:
+                return None
+            try:
+                if int(answer) > 0:
+                    return int(answer)
+            except ValueError:
+                pass
+            self.console.print('Invalid number, please enter a positive integer.')
+
+    def display_conflict(self, error):
+        self.console.input(f'{error}, data has been reloaded, please try again.\n')
 
     def display_objects(self, objects_list):
         """ print an enumerated list of objects."""
-        print("\n".join(f"\t{i}- {obj}" for i, obj in enumerate(objects_list, 1)))
+        self.console.print("\n".join(f"\t{i}- {obj}" for i, obj in enumerate(objects_list, 1)))
 
-    def get_selected_object(self, objects_list):
-        """ Display an enumerated list of objects and return the object
-            selected By the user
+    def get_selected_object(self, objects, search=None):
+        """ Display objects one page at a time and return the object
+            selected by the user, who can also move between pages and
+            search. objects is a list or a paged search result of the
+            models, search a function returning the results of a query;
+            lists are searched by name by default.
         """
-        self.display_objects(objects_list)
-        user_choice = input('=> ')
-        try:
-            user_choice = int(user_choice)
-            obj = objects_list[user_choice - 1]
-        except (ValueError, IndexError):
-            input('Invalid choice, please try again:\n')
-            return self.get_selected_object(objects_list)
-        else:
-            return obj
+        if isinstance(objects, list):
+            search = search or prefix_search(objects)
+            objects = ListPages(objects)
+        results, number = objects, 0
+        while True:
+            nb_pages = max(1, -(-len(results) // PAGE_SIZE))
+            page = results.page(number, PAGE_SIZE)
+            if nb_pages > 1:
+                self.console.print(f'{len(results)} results, page {number + 1}/{nb_pages}:')
+            self.display_objects(page)
+            if not page:
+                self.console.print('\tNo results.')
+            user_choice = self.console.input(
+                '=> ' if nb_pages == 1 and results is objects else
+                'Select a number, ENTER or - for the next or previous page, '
+                'or type to search:\n=> '
+            ).strip()
+            if user_choice.isdigit() and 1 <= int(user_choice) <= len(page):
+                return page[int(user_choice) - 1]
+            elif user_choice == '' and number + 1 < nb_pages:
+                number += 1
+            elif user_choice == '-' and number > 0:
+                number -= 1
+            elif user_choice and not user_choice.isdigit() and user_choice != '-' and search:
+                results, number = search(user_choice), 0
+                if isinstance(results, list):
+                    results = ListPages(results)
+            else:
+                self.console.input('Invalid choice, please try again:\n')
@@ -12,7 +12,7 @@ class PlayerView(BaseView):
                 'action': controller.create
             }
         }
-        if controller.model.all():
+        if controller.model.exists():
             self.mapping.update(
                 {
                     generator.__next__(): {
@@ -26,6 +26,14 @@ class PlayerView(BaseView):
                     generator.__next__(): {
                         'description': 'Update players ranking',
                         'action': controller.update_rank
+                    },
+                    generator.__next__(): {
+                        'description': 'Recompute players rating from match results',
+                        'action': controller.update_ratings
+                    },
+                    generator.__next__(): {
+                        'description': 'Display player statistics',
+                        'action': controller.show_statistics
                     }
                 }
             )
@@ -39,29 +47,56 @@ class PlayerView(BaseView):
         )
 
     def get_first_name(self):
-        return input('Enter first name:\n =>')
+        return self.console.input('Enter first name:\n =>')
 
     def get_last_name(self):
-        return input('Enter last name:\n')
+        return self.console.input('Enter last name:\n')
 
     def get_birth_date(self):
-        return input('Enter birth date (format dd/mm/yyyy):\n')
+        return self.console.input('Enter birth date (format dd/mm/yyyy):\n')
 
     def get_sexe(self):
-        return input('Enter sexe:\n')
+        return self.console.input('Enter sexe:\n')
 
     def get_rank(self):
-        return input('Enter rank:\n')
+        return self.get_positive_int('Enter rank:\n')
 
-    def display_players(self, players):
-        print('List of all registred players:')
+    def display_players(self, players, page=1, nb_pages=1):
+        """ Display a page of players, return True to show the next one. """
+        self.console.print(f'List of all registred players (page {page}/{nb_pages}):')
         self.display_objects(players)
-        input('\nPress ENTER to continu\n')  # avoid clearing interface
+        if page < nb_pages:
+            return self.console.input('\nPress ENTER for the next page, q to stop\n') != 'q'
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+        return False
 
-    def update_rank(self, players):
-        print('Select a player from the list below:\n')
-        obj = self.get_selected_object(players)
-        rank = input('Enter a new rank for the player:\n=>')
+    def display_ratings_updated(self, nb_players):
+        self.console.print(f'Ratings and ranks of {nb_players} players have been updated.')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def get_player(self, players, search):
+        self.console.print('Select a player from the list below, or search a last name or a #rank:\n')
+        return self.get_selected_object(players, search)
+
+    def display_statistics(self, player, statistics, head_to_head):
+        self.console.print(f'Statistics of {player}:\n')
+        self.console.print(
+            f'\tgames: {statistics.nb_games} '
+            f'(+{statistics.wins} ={statistics.draws} -{statistics.losses})'
+        )
+        self.console.print(f'\tscore: {statistics.score}/{statistics.nb_games} ({statistics.percentage:.1%})')
+        if statistics.performance is not None:
+            self.console.print(f'\tperformance rating: {statistics.performance:.0f}')
+        if head_to_head:
+            self.console.print(f'\n\t{"opponent":<30} {"games":>6} {"score":>6}')
+            for opponent, nb_games, score in head_to_head:
+                self.console.print(f'\t{str(opponent):<30} {nb_games:>6} {score:>6}')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def update_rank(self, players, search):
+        self.console.print('Select a player from the list below, or search a last name or a #rank:\n')
+        obj = self.get_selected_object(players, search)
+        rank = self.get_positive_int('Enter a new rank for the player:\n=>')
         return obj, rank
 
 
@@ -75,7 +110,8 @@ class TournamentView(BaseView):
                 'action': controller.create
             }
         }
-        if controller.model.get_unready():
+        statuses = set(controller.model.status_index().values())
+        if 'unready' in statuses:
             self.mapping.update(
                 {
                     generator.__next__(): {
@@ -84,16 +120,24 @@ class TournamentView(BaseView):
                     }
                 }
             )
-        if controller.model.get_unfinished():
+        if 'unfinished' in statuses:
             self.mapping.update(
                 {
                     generator.__next__(): {
                         'description': 'Enter match results',
                         'action': controller.enter_results
+                    },
+                    generator.__next__(): {
+                        'description': 'Enter all results of the round',
+                        'action': controller.enter_round_results
+                    },
+                    generator.__next__(): {
+                        'description': 'Display standings forecast',
+                        'action': controller.display_forecast
                     }
                 }
             )
-        if controller.model.get_ready():
+        if statuses & {'unfinished', 'finished'}:
             self.mapping.update(
                 {
                     generator.__next__(): {
@@ -106,7 +150,7 @@ class TournamentView(BaseView):
                     }
                 }
             )
-        if controller.model.all():
+        if statuses:
             self.mapping.update(
                 {
                     generator.__next__(): {
@@ -115,6 +159,37 @@ class TournamentView(BaseView):
                     }
                 }
             )
+        if 'finished' in statuses:
+            self.mapping.update(
+                {
+                    generator.__next__(): {
+                        'description': 'Archive finished tournaments',
+                        'action': controller.archive
+                    }
+                }
+            )
+        if controller.model.archive_exists():
+            self.mapping.update(
+                {
+                    generator.__next__(): {
+                        'description': 'Display archived tournament',
+                        'action': controller.display_archive
+                    }
+                }
+            )
+        if statuses & {'unfinished', 'finished'}:
+            self.mapping.update(
+                {
+                    generator.__next__(): {
+                        'description': 'Enter the moves of a match',
+                        'action': controller.enter_moves
+                    },
+                    generator.__next__(): {
+                        'description': 'Display the moves of a match',
+                        'action': controller.display_moves
+                    }
+                }
+            )
         self.mapping.update(
             {
                 generator.__next__(): {
@@ -125,43 +200,123 @@ class TournamentView(BaseView):
             }
         )
 
-    def get_player(self, players, tournament):
-        print(f'Please select a player to enroll in {tournament.name}:\n')
-        obj = self.get_selected_object(players)
+    def get_player(self, players, tournament, search):
+        self.console.print(
+            f'Please select a player to enroll in {tournament.name}, or search a last name or a #rank:\n'
+        )
+        obj = self.get_selected_object(players, search)
         return obj
 
     def set_score(self, players, tournament):
-        print(f'tournament: {tournament}')
-        print(f'match: {tournament.get_active_match()}')
-        print('Please select the winner of the match:\n')
+        self.console.print(f'tournament: {tournament}')
+        self.console.print(f'match: {tournament.get_active_match()}')
+        self.console.print('Please select the winner of the match:\n')
         return self.get_selected_object(players)
 
+    def get_round_results(self, round, boards):
+        """ Ask the result of each (board, player 1, player 2) and return
+            for each the winner, 'draw', or None if it was skipped.
+        """
+        self.console.print(f'Results of {round}: 1 or 2 for the winner, d for a draw, ENTER to skip.\n')
+        winners = []
+        for board, player_1, player_2 in boards:
+            while True:
+                choice = self.console.input(f'\tboard {board}: {player_1} VS {player_2} => ').strip().lower()
+                if choice in ('', '1', '2', 'd'):
+                    break
+                self.console.print('\tInvalid choice, please try again.')
+            winners.append({'': None, '1': player_1, '2': player_2, 'd': 'draw'}[choice])
+        return winners
+
+    def display_round_results_saved(self, nb_saved, nb_pending):
+        self.console.print(f'\n{nb_saved} of {nb_pending} pending results saved.')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def display_no_match(self):
+        self.console.print('No match of this tournament has been paired yet.')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def get_match(self, matchs):
+        self.console.print('Please select a match, or search a player name:\n')
+        return self.get_selected_object(matchs)
+
+    def get_moves(self, match):
+        self.console.print(f'match: {match}')
+        return self.console.input('Enter the moves in SAN, such as "1. e4 e5 2. Nf3":\n')
+
+    def display_illegal_move(self, error):
+        self.console.print(f'{error}, please enter the moves again.')
+
+    def display_moves(self, match, movetext):
+        if match is None:
+            self.console.print('No match of this tournament has recorded moves.')
+        else:
+            self.console.print(f'{match}\n\n\t{movetext}')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def display_no_tournament(self):
+        self.console.print('No tournament is available for this action.')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
     def get_active_tournament(self, tournaments):
-        print('Please select a tournament from the list below:\n')
+        self.console.print('Please select a tournament from the list below:\n')
         obj = self.get_selected_object(tournaments)
         return obj
 
     def display_tournaments(self, tournaments):
-        print('List of all registred tournaments:\n')
+        self.console.print('List of all registred tournaments:\n')
         self.display_objects(tournaments)
-        input('\nPress ENTER to continu\n')  # avoid clearing interface
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def display_archived(self, tournaments):
+        self.console.print(f'{len(tournaments)} finished tournaments have been archived:\n')
+        self.display_objects([f'{tournament.name} ({tournament.season})' for tournament in tournaments])
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def get_season(self, seasons):
+        self.console.print('Please select a season from the list below:\n')
+        return self.get_selected_object(seasons)
 
     def display_results(self, players, tournament):
-        print(f'Results for tournament {tournament}:\n')
+        self.console.print(f'Results for tournament {tournament}:\n')
+        tiebreaks = tournament.tiebreaks
+        self.console.print(f'\t{"player":<30} {"score":>6} {"buchholz":>9} {"s-b":>7} {"prog.":>6}')
         for player in players:
-            print(f'\t[{player}]: {tournament.total_score(player)}')
-        input('\nPress ENTER to continu\n')  # avoid clearing interface
+            self.console.print(
+                f'\t{str(player):<30} {tournament.total_score(player):>6} '
+                f'{tiebreaks.buchholz(player.id):>9} {tiebreaks.sonneborn_berger(player.id):>7} '
+                f'{tiebreaks.progressive(player.id):>6}'
+            )
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
+
+    def display_forecast_progress(self, done, total):
+        end = '\n' if done == total else '\r'
+        self.console.print(f'Simulating the remaining rounds: {done}/{total} tournaments', end=end, flush=True)
+
+    def display_forecast(self, players, forecast, tournament, top):
+        self.console.print(f'Forecast for tournament {tournament}:\n')
+        self.console.print(f'\t{"player":<30} {"winner":>8} {f"top {top}":>8}')
+        for player in players:
+            first, podium = forecast[player.id]
+            self.console.print(f'\t{str(player):<30} {first:>8.1%} {podium:>8.1%}')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
 
     def display_report(self, tournament):
-        print(f'Report for tournament {tournament}:\n')
+        self.console.print(f'Report for tournament {tournament}:\n')
         for round in tournament.rounds:
-            print(f'\t{round}')
+            self.console.print(f'\t{round}')
             for match in round.matchs:
-                print(f'\t\t{match}')
-        input('\nPress ENTER to continu\n')  # avoid clearing interface
+                self.console.print(f'\t\t{match}')
+        self.console.input('\nPress ENTER to continu\n')  # avoid clearing interface
 
     def get_name(self):
-        return input('Enter a name for the new tournament:\n')
+        return self.console.input('Enter a name for the new tournament:\n')
+
+    def get_nb_rounds(self, default):
+        return self.get_positive_int(f'Enter the number of rounds (default {default}):\n', optional=True)
+
+    def get_nb_players(self, default):
+        return self.get_positive_int(f'Enter the number of players (default {default}):\n', optional=True)
 
 
 class AppView(BaseView):